@@ -0,0 +1,377 @@
+const crypto = require('crypto');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const v8 = require('v8');
+
+// Compiled agent-definition cache and warm agent pool for the Agent Reuse
+// Registry.
+//
+// AgentDefinitionCache parses each `.claude/agents/*.md` definition once and
+// stores the result in v8-serialized form under the cache directory, keyed
+// by the SHA-256 of the markdown. A file whose size and mtime still match the
+// manifest is served without being read again; otherwise it is hashed, and a
+// changed hash recompiles it. WarmAgentPool keeps initialized agent instances
+// around between uses with LRU order, a TTL and a memory budget, and counts
+// hits, misses, evictions and cold vs warm acquisition time.
+
+const MANIFEST_FILE = 'manifest.json';
+const CACHE_VERSION = 1;
+
+const DEFAULT_POOL_OPTIONS = {
+  maxInstances: 256,
+  ttlMs: 30 * 60 * 1000,
+  memoryBudgetBytes: 256 * 1024 * 1024
+};
+
+function contentHash(buffer) {
+  return crypto.createHash('sha256').update(buffer).digest('hex');
+}
+
+// Splits an agent definition into frontmatter fields and `##` sections
+function parseAgentDefinition(markdown, file = '') {
+  const definition = { name: path.basename(file, '.md'), frontmatter: {}, sections: {}, body: markdown };
+  let body = markdown;
+  const frontmatter = /^---\r?\n([\s\S]*?)\r?\n---\r?\n?/.exec(markdown);
+  if (frontmatter) {
+    for (const line of frontmatter[1].split(/\r?\n/)) {
+      const match = /^([A-Za-z0-9_-]+):\s*(.*)$/.exec(line);
+      if (!match) continue;
+      const value = match[2].trim().replace(/^["']|["']$/g, '');
+      definition.frontmatter[match[1]] = value.includes(',') && match[1] === 'tools'
+        ? value.split(',').map(tool => tool.trim()).filter(Boolean)
+        : value;
+    }
+    body = markdown.slice(frontmatter[0].length);
+  }
+  definition.body = body.trim();
+  if (definition.frontmatter.name) definition.name = definition.frontmatter.name;
+  definition.description = definition.frontmatter.description || '';
+  definition.tools = [].concat(definition.frontmatter.tools || []);
+
+  let current = 'overview';
+  for (const line of body.split(/\r?\n/)) {
+    const heading = /^##\s+(.+)$/.exec(line);
+    if (heading) {
+      current = heading[1].trim().toLowerCase();
+      continue;
+    }
+    definition.sections[current] = definition.sections[current] ? `${definition.sections[current]}\n${line}` : line;
+  }
+  for (const [name, text] of Object.entries(definition.sections)) {
+    definition.sections[name] = text.trim();
+    if (!definition.sections[name]) delete definition.sections[name];
+  }
+  return definition;
+}
+
+class AgentDefinitionCache {
+  constructor(agentsDir, cacheDir = path.join(agentsDir, '.cache')) {
+    this.agentsDir = agentsDir;
+    this.cacheDir = cacheDir;
+    this.manifest = { version: CACHE_VERSION, files: {} };
+    this.memory = new Map();
+    this.counters = { hits: 0, misses: 0, compiled: 0 };
+    this.dirty = false;
+    this.batching = false;
+    this._loadManifest();
+  }
+
+  _loadManifest() {
+    const manifestPath = path.join(this.cacheDir, MANIFEST_FILE);
+    if (!fs.existsSync(manifestPath)) return;
+    const manifest = JSON.parse(fs.readFileSync(manifestPath, 'utf8'));
+    if (manifest.version === CACHE_VERSION) this.manifest = manifest;
+  }
+
+  _flush() {
+    if (!this.dirty) return;
+    this._saveManifest();
+    this.dirty = false;
+  }
+
+  _saveManifest() {
+    fs.mkdirSync(this.cacheDir, { recursive: true });
+    const target = path.join(this.cacheDir, MANIFEST_FILE);
+    fs.writeFileSync(`${target}.tmp`, JSON.stringify(this.manifest));
+    fs.renameSync(`${target}.tmp`, target);
+  }
+
+  _compiledPath(hash) {
+    return path.join(this.cacheDir, `${hash}.bin`);
+  }
+
+  _readCompiled(hash) {
+    if (this.memory.has(hash)) return this.memory.get(hash);
+    const file = this._compiledPath(hash);
+    if (!fs.existsSync(file)) return null;
+    const definition = v8.deserialize(fs.readFileSync(file));
+    this.memory.set(hash, definition);
+    return definition;
+  }
+
+  // Returns { hash, definition } for one agent file, compiling only when the
+  // content changed since it was last seen
+  get(file) {
+    const fullPath = path.resolve(this.agentsDir, file);
+    const key = path.relative(this.agentsDir, fullPath);
+    const stat = fs.statSync(fullPath);
+    const known = this.manifest.files[key];
+
+    if (known && known.size === stat.size && known.mtimeMs === stat.mtimeMs) {
+      const definition = this._readCompiled(known.hash);
+      if (definition) {
+        this.counters.hits++;
+        return { hash: known.hash, definition };
+      }
+    }
+
+    const markdown = fs.readFileSync(fullPath);
+    const hash = contentHash(markdown);
+    let definition = this._readCompiled(hash);
+    if (definition) {
+      this.counters.hits++;
+    } else {
+      this.counters.misses++;
+      this.counters.compiled++;
+      definition = parseAgentDefinition(markdown.toString('utf8'), fullPath);
+      fs.mkdirSync(this.cacheDir, { recursive: true });
+      fs.writeFileSync(this._compiledPath(hash), v8.serialize(definition));
+      this.memory.set(hash, definition);
+    }
+    if (known && known.hash !== hash) this._dropIfUnused(known.hash, key);
+    this.manifest.files[key] = { hash, size: stat.size, mtimeMs: stat.mtimeMs };
+    this.dirty = true;
+    if (!this.batching) this._flush();
+    return { hash, definition };
+  }
+
+  _dropIfUnused(hash, exceptKey) {
+    const stillUsed = Object.entries(this.manifest.files).some(([key, entry]) => key !== exceptKey && entry.hash === hash);
+    if (stillUsed) return;
+    this.memory.delete(hash);
+    fs.rmSync(this._compiledPath(hash), { force: true });
+  }
+
+  // Compiles every definition in the agents directory and forgets files
+  // that were deleted
+  loadAll() {
+    const files = fs.readdirSync(this.agentsDir).filter(name => name.endsWith('.md')).sort();
+    this.batching = true;
+    try {
+      const result = new Map(files.map(file => [file, this.get(file)]));
+      for (const key of Object.keys(this.manifest.files)) {
+        if (!result.has(key)) {
+          const { hash } = this.manifest.files[key];
+          delete this.manifest.files[key];
+          this._dropIfUnused(hash, key);
+          this.dirty = true;
+        }
+      }
+      return result;
+    } finally {
+      this.batching = false;
+      this._flush();
+    }
+  }
+}
+
+// --------------------------------------------------------------- warm pool
+
+class WarmAgentPool {
+  // `initialize(definition, variant)` builds an agent instance (context, prompts,
+  // tool bindings) and may be async; `sizeOf(instance)` estimates its memory
+  constructor(initialize, options = {}) {
+    this.initialize = initialize;
+    this.options = { ...DEFAULT_POOL_OPTIONS, ...options };
+    this.sizeOf = this.options.sizeOf || (instance => Buffer.byteLength(JSON.stringify(instance) || ''));
+    this.entries = new Map();
+    // key -> Promise of an instance being initialized; concurrent acquires
+    // for the same key share it instead of each starting a cold init
+    this.pending = new Map();
+    this.bytes = 0;
+    this.counters = { hits: 0, misses: 0, shared: 0, evictions: 0, expirations: 0 };
+    this.timings = { coldMs: 0, coldCount: 0, warmMs: 0, warmCount: 0 };
+  }
+
+  // Instances are keyed by definition hash plus a caller-supplied variant
+  // (e.g. command and technology stack), so an edited definition never
+  // serves a stale instance
+  async acquire(hash, definition, variant = '') {
+    const start = process.hrtime.bigint();
+    const key = `${hash}:${variant}`;
+    const now = Date.now();
+    const cached = this.entries.get(key);
+    if (cached && now - cached.createdAt <= this.options.ttlMs) {
+      // Re-insert to move the entry to the most-recently-used end
+      this.entries.delete(key);
+      this.entries.set(key, cached);
+      cached.lastUsed = now;
+      this.counters.hits++;
+      this._record('warm', start);
+      return cached.instance;
+    }
+    if (cached) {
+      this._remove(key);
+      this.counters.expirations++;
+    }
+
+    if (this.pending.has(key)) {
+      this.counters.shared++;
+      return this.pending.get(key);
+    }
+
+    this.counters.misses++;
+    const initializing = (async () => {
+      const instance = await this.initialize(definition, variant);
+      const bytes = this.sizeOf(instance);
+      if (this.entries.has(key)) this._remove(key);
+      this.entries.set(key, { instance, bytes, createdAt: now, lastUsed: now });
+      this.bytes += bytes;
+      this._evict();
+      return instance;
+    })();
+    this.pending.set(key, initializing);
+    try {
+      const instance = await initializing;
+      this._record('cold', start);
+      return instance;
+    } finally {
+      this.pending.delete(key);
+    }
+  }
+
+  _record(kind, start) {
+    this.timings[`${kind}Ms`] += Number(process.hrtime.bigint() - start) / 1e6;
+    this.timings[`${kind}Count`]++;
+  }
+
+  _remove(key) {
+    this.bytes -= this.entries.get(key).bytes;
+    this.entries.delete(key);
+  }
+
+  // Map iteration order is insertion order, so the first key is the LRU one
+  _evict() {
+    const { maxInstances, memoryBudgetBytes } = this.options;
+    while (this.entries.size > 1 && (this.entries.size > maxInstances || this.bytes > memoryBudgetBytes)) {
+      this._remove(this.entries.keys().next().value);
+      this.counters.evictions++;
+    }
+  }
+
+  // Drops instances past their TTL; call periodically
+  sweep() {
+    const now = Date.now();
+    for (const [key, entry] of this.entries) {
+      if (now - entry.createdAt > this.options.ttlMs) {
+        this._remove(key);
+        this.counters.expirations++;
+      }
+    }
+  }
+
+  stats() {
+    const { hits, misses, shared } = this.counters;
+    const { coldMs, coldCount, warmMs, warmCount } = this.timings;
+    return {
+      ...this.counters,
+      hitRate: hits + shared + misses === 0 ? 0 : (hits + shared) / (hits + shared + misses),
+      instances: this.entries.size,
+      bytes: this.bytes,
+      avgColdMs: coldCount === 0 ? 0 : coldMs / coldCount,
+      avgWarmMs: warmCount === 0 ? 0 : warmMs / warmCount
+    };
+  }
+}
+
+// ------------------------------------------------------------------ benchmark
+
+const ROLES = ['planner', 'implementer', 'refactorer', 'security', 'tester', 'optimizer', 'reviewer'];
+
+function syntheticAgent(i) {
+  const role = ROLES[i % ROLES.length];
+  const paragraphs = Array.from({ length: 40 }, (_, p) =>
+    `- Guideline ${p + 1} for the ${role} agent: keep BMAD gates, SAGE patterns and Archon context consistent.`);
+  return [
+    '---',
+    `name: ${role}-agent-${i}`,
+    `description: Specialized ${role} agent ${i} for the integrated context system`,
+    'tools: Read, Write, Edit, Bash, Grep',
+    '---',
+    '',
+    `You are the ${role} agent.`,
+    '',
+    '## Responsibilities',
+    ...paragraphs,
+    '',
+    '## Workflow',
+    ...paragraphs.slice(0, 20),
+    '',
+    '## Output Format',
+    'Return a markdown report with findings, decisions and next steps.'
+  ].join('\n');
+}
+
+// Stands in for building an agent's working context from its definition
+function initializeAgent(definition, variant) {
+  const context = Object.entries(definition.sections)
+    .map(([name, text]) => `### ${name}\n${text}`)
+    .join('\n\n');
+  let checksum = 0;
+  for (let round = 0; round < 200; round++) {
+    for (let i = 0; i < context.length; i++) checksum = (checksum * 31 + context.charCodeAt(i)) >>> 0;
+  }
+  return { name: definition.name, variant, tools: definition.tools, context, checksum };
+}
+
+async function runBenchmark({ agents = 42, commands = 20 } = {}) {
+  const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'agent-cache-bench-'));
+  const agentsDir = path.join(workDir, 'agents');
+  fs.mkdirSync(agentsDir);
+  for (let i = 0; i < agents; i++) fs.writeFileSync(path.join(agentsDir, `agent-${i}.md`), syntheticAgent(i));
+  const variants = ['PLAN', 'IMPLEMENT', 'OPTIMIZE', 'QA'];
+
+  // Current behaviour: every command re-parses and re-initializes every agent
+  let start = Date.now();
+  for (let run = 0; run < commands; run++) {
+    for (const file of fs.readdirSync(agentsDir)) {
+      const definition = parseAgentDefinition(fs.readFileSync(path.join(agentsDir, file), 'utf8'), file);
+      initializeAgent(definition, variants[run % variants.length]);
+    }
+  }
+  const baselineMs = Date.now() - start;
+
+  // Cached: each command run opens a fresh definition cache (new process) but
+  // keeps the warm pool, as the long-running server would
+  const pool = new WarmAgentPool(initializeAgent);
+  start = Date.now();
+  for (let run = 0; run < commands; run++) {
+    if (run === commands / 2) fs.appendFileSync(path.join(agentsDir, 'agent-0.md'), '\n- Edited guideline\n');
+    const cache = new AgentDefinitionCache(agentsDir, path.join(workDir, 'cache'));
+    for (const { hash, definition } of cache.loadAll().values()) {
+      await pool.acquire(hash, definition, variants[run % variants.length]);
+    }
+  }
+  const cachedMs = Date.now() - start;
+  const stats = pool.stats();
+
+  console.table([
+    { mode: 'parse + init every run', 'total ms': baselineMs, 'ms per command': (baselineMs / commands).toFixed(1) },
+    { mode: 'compiled cache + warm pool', 'total ms': cachedMs, 'ms per command': (cachedMs / commands).toFixed(1) }
+  ]);
+  console.log(`\n🔥 Pool: ${stats.hits} hits, ${stats.misses} misses, ${stats.evictions} evictions, ` +
+    `hit rate ${(stats.hitRate * 100).toFixed(1)}%`);
+  console.log(`⏱️  Avg cold start ${stats.avgColdMs.toFixed(3)} ms vs warm ${stats.avgWarmMs.toFixed(4)} ms`);
+  fs.rmSync(workDir, { recursive: true, force: true });
+}
+
+if (require.main === module) {
+  console.log('🤖 Agent definition cache benchmark (re-parse vs compiled cache + warm pool)\n');
+  runBenchmark().catch(error => {
+    console.error('❌ Benchmark failed:', error);
+    process.exit(1);
+  });
+}
+
+module.exports = { AgentDefinitionCache, WarmAgentPool, parseAgentDefinition, contentHash };
@@ -0,0 +1,542 @@
+const { execFileSync } = require('child_process');
+const crypto = require('crypto');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+// Incremental, content-addressed checkpoints for Enhanced Error Recovery.
+//
+// Files are split into chunks that are stored once under their SHA-256, so a
+// checkpoint only writes chunks that no earlier checkpoint already holds.
+// Each checkpoint manifest records just the files that changed since its
+// parent (a full manifest is written every `fullEvery` checkpoints), and the
+// store keeps the working tree's last known state in memory, so an unchanged
+// file costs one stat and no read. Callers that already know which paths a
+// step touched (git status, a watcher) can pass them and skip the tree walk.
+//
+// SQLite databases are never read as raw files, since a writer may be
+// mid-transaction. They are copied through the online backup API, which
+// yields a consistent snapshot with the WAL folded in. The copy is chunked on
+// its page size, so a step that rewrites ten pages adds ten chunks. `-wal`,
+// `-shm` and `-journal` files are neither captured nor restored.
+//
+// Restore compares the target manifest with the current state and writes
+// only the chunks that differ, in place, so rolling back a RED/GREEN step
+// touches the files that step changed. A database is restored as a whole
+// through the backup API instead, which takes its write lock. Connections
+// should still be closed before a restore (or reopened after it) so no open
+// transaction sees the database change underneath it.
+
+const INDEX_FILE = 'index.json';
+const STORE_VERSION = 1;
+const SQLITE_MAGIC = 'SQLite format 3\u0000';
+const SQLITE_SIDE_FILE = /-(wal|shm|journal)$/;
+
+const DEFAULT_OPTIONS = {
+  chunkBytes: 256 * 1024,
+  fullEvery: 50,
+  exclude: ['.git', 'node_modules'],
+  // (source, destination) => void; both default to the sqlite3 CLI, whose
+  // .backup and .restore use the online backup API. With an open
+  // better-sqlite3 handle, `db.exec(\`VACUUM INTO '${destination}'\`)` works too.
+  sqliteBackup: (source, destination) => execFileSync('sqlite3', [source, `.backup '${destination}'`]),
+  sqliteRestore: (source, destination) => execFileSync('sqlite3', [destination, `.restore '${source}'`])
+};
+
+function sha256(buffer) {
+  return crypto.createHash('sha256').update(buffer).digest('hex');
+}
+
+// Chunk layout of a file: the first chunk is `first` bytes, every later
+// chunk is `size` bytes
+function layoutFor(fd, size, chunkBytes) {
+  if (size >= 100) {
+    const header = Buffer.alloc(18);
+    fs.readSync(fd, header, 0, 18, 0);
+    if (header.toString('latin1', 0, 16) === SQLITE_MAGIC) {
+      const raw = header.readUInt16BE(16);
+      const pageSize = raw === 1 ? 65536 : raw;
+      return { first: pageSize, size: pageSize };
+    }
+  }
+  return { first: chunkBytes, size: chunkBytes };
+}
+
+function chunkOffset(layout, index) {
+  return index === 0 ? 0 : layout.first + (index - 1) * layout.size;
+}
+
+function isSqlite(fd, size) {
+  if (size < 100) return false;
+  const header = Buffer.alloc(16);
+  fs.readSync(fd, header, 0, 16, 0);
+  return header.toString('latin1') === SQLITE_MAGIC;
+}
+
+// In WAL mode a commit may only touch the `-wal` file, so a database's stat
+// includes its WAL's
+function walStamp(fullPath) {
+  try {
+    const stat = fs.statSync(`${fullPath}-wal`);
+    return `${stat.size}:${stat.mtimeMs}`;
+  } catch (error) {
+    if (error.code !== 'ENOENT') throw error;
+    return null;
+  }
+}
+
+function sameStat(entry, stat, fullPath) {
+  return Boolean(entry) && entry.size === stat.size && entry.mtimeMs === stat.mtimeMs && entry.ino === stat.ino &&
+    (!entry.sqlite || entry.wal === walStamp(fullPath));
+}
+
+function removeSqliteSideFiles(fullPath) {
+  for (const suffix of ['-wal', '-shm', '-journal']) fs.rmSync(`${fullPath}${suffix}`, { force: true });
+}
+
+class CheckpointStore {
+  constructor(storeDir, root, options = {}) {
+    this.storeDir = storeDir;
+    this.root = path.resolve(root);
+    this.options = { ...DEFAULT_OPTIONS, ...options };
+    // `head` is the checkpoint the working tree was last saved as or restored
+    // to; the next checkpoint records its changes relative to it
+    this.index = { version: STORE_VERSION, next: 1, head: null, checkpoints: [] };
+    this.state = new Map();
+    // Last full manifest, parsed; restores within its chain skip re-reading it
+    this.lastFull = null;
+    this.counters = { chunksWritten: 0, chunksReused: 0, bytesWritten: 0, filesRead: 0 };
+  }
+
+  static open(storeDir, root, options = {}) {
+    const store = new CheckpointStore(storeDir, root, options);
+    store._load();
+    return store;
+  }
+
+  _load() {
+    fs.mkdirSync(path.join(this.storeDir, 'objects'), { recursive: true });
+    fs.mkdirSync(path.join(this.storeDir, 'checkpoints'), { recursive: true });
+    const indexPath = path.join(this.storeDir, INDEX_FILE);
+    if (fs.existsSync(indexPath)) {
+      const index = JSON.parse(fs.readFileSync(indexPath, 'utf8'));
+      if (index.version === STORE_VERSION) this.index = index;
+    }
+    const head = this._head();
+    if (head) this.state = this._materialize(head.id);
+  }
+
+  _head() {
+    const { head, checkpoints } = this.index;
+    return head ? checkpoints.find(checkpoint => checkpoint.id === head) : checkpoints[checkpoints.length - 1];
+  }
+
+  _saveIndex() {
+    const target = path.join(this.storeDir, INDEX_FILE);
+    fs.writeFileSync(`${target}.tmp`, JSON.stringify(this.index));
+    fs.renameSync(`${target}.tmp`, target);
+  }
+
+  _manifestPath(id) {
+    return path.join(this.storeDir, 'checkpoints', `${id}.json`);
+  }
+
+  _objectPath(hash) {
+    return path.join(this.storeDir, 'objects', hash.slice(0, 2), hash.slice(2));
+  }
+
+  // Rebuilds the full file map of a checkpoint from its nearest full manifest
+  _materialize(id) {
+    const chain = [];
+    let current = id;
+    while (current) {
+      const manifest = this.lastFull && this.lastFull.id === current
+        ? this.lastFull
+        : JSON.parse(fs.readFileSync(this._manifestPath(current), 'utf8'));
+      chain.unshift(manifest);
+      if (manifest.full) this.lastFull = manifest;
+      current = manifest.full ? null : manifest.parent;
+    }
+    const files = new Map();
+    for (const manifest of chain) {
+      for (const file of manifest.deleted) files.delete(file);
+      for (const [file, entry] of Object.entries(manifest.files)) files.set(file, entry);
+    }
+    return files;
+  }
+
+  // ----------------------------------------------------------- checkpointing
+
+  _isExcluded(relative) {
+    const storeRelative = path.relative(this.root, this.storeDir);
+    if (relative === storeRelative || relative.startsWith(`${storeRelative}${path.sep}`)) return true;
+    return relative.split(path.sep).some(part => this.options.exclude.includes(part));
+  }
+
+  *_walk(dir = this.root) {
+    for (const dirent of fs.readdirSync(dir, { withFileTypes: true })) {
+      const full = path.join(dir, dirent.name);
+      const relative = path.relative(this.root, full);
+      if (this._isExcluded(relative)) continue;
+      if (dirent.isDirectory()) {
+        yield* this._walk(full);
+      } else if (dirent.isFile() && !this._isSqliteSideFile(relative)) {
+        yield relative;
+      }
+    }
+  }
+
+  // `-wal`/`-shm`/`-journal` next to a database are covered by its snapshot
+  _isSqliteSideFile(relative) {
+    const match = SQLITE_SIDE_FILE.exec(relative);
+    return Boolean(match) && fs.existsSync(path.join(this.root, relative.slice(0, match.index)));
+  }
+
+  // Paths to scan: the hinted ones (side files mapped to their database) or
+  // the whole tree
+  _candidates(changed) {
+    if (!changed) return [...this._walk()];
+    const candidates = new Set();
+    for (const file of changed) {
+      const relative = path.relative(this.root, path.resolve(this.root, file));
+      const match = SQLITE_SIDE_FILE.exec(relative);
+      candidates.add(match ? relative.slice(0, match.index) : relative);
+    }
+    return [...candidates];
+  }
+
+  _storeChunk(buffer) {
+    const hash = sha256(buffer);
+    const target = this._objectPath(hash);
+    if (fs.existsSync(target)) {
+      this.counters.chunksReused++;
+      return hash;
+    }
+    fs.mkdirSync(path.dirname(target), { recursive: true });
+    fs.writeFileSync(target, buffer);
+    this.counters.chunksWritten++;
+    this.counters.bytesWritten += buffer.length;
+    return hash;
+  }
+
+  _tempPath() {
+    return path.join(this.storeDir, `tmp-${process.pid}-${crypto.randomBytes(6).toString('hex')}`);
+  }
+
+  _chunkFd(fd, size) {
+    const layout = layoutFor(fd, size, this.options.chunkBytes);
+    const chunks = [];
+    let offset = 0;
+    for (let index = 0; offset < size; index++) {
+      const length = Math.min(index === 0 ? layout.first : layout.size, size - offset);
+      const buffer = Buffer.allocUnsafe(length);
+      fs.readSync(fd, buffer, 0, length, offset);
+      chunks.push(this._storeChunk(buffer));
+      offset += length;
+    }
+    return { layout, chunks };
+  }
+
+  // Chunks one file; chunks the store already holds are not written again.
+  // Databases are chunked from a backup-API snapshot, not the live file.
+  _captureFile(relative, stat) {
+    const full = path.join(this.root, relative);
+    const entry = { size: stat.size, mtimeMs: stat.mtimeMs, ino: stat.ino, mode: stat.mode };
+    let fd = fs.openSync(full, 'r');
+    try {
+      if (!isSqlite(fd, stat.size)) return { ...entry, ...this._chunkFd(fd, stat.size) };
+    } finally {
+      fs.closeSync(fd);
+      this.counters.filesRead++;
+    }
+    // Stamp the WAL before copying: a commit racing the copy then shows up
+    // as a changed stamp on the next checkpoint
+    const wal = walStamp(full);
+    const snapshot = this._tempPath();
+    try {
+      this.options.sqliteBackup(full, snapshot);
+      fd = fs.openSync(snapshot, 'r');
+      try {
+        return { ...entry, sqlite: true, wal, ...this._chunkFd(fd, fs.fstatSync(fd).size) };
+      } finally {
+        fs.closeSync(fd);
+      }
+    } finally {
+      fs.rmSync(snapshot, { force: true });
+    }
+  }
+
+  // Records the working tree. `changed` limits the scan to the given paths
+  // (relative to root) when the caller knows what the step touched.
+  checkpoint(label = '', { changed } = {}) {
+    const candidates = this._candidates(changed);
+    const seen = new Set();
+    const files = {};
+    const deleted = [];
+
+    for (const relative of candidates) {
+      if (this._isExcluded(relative)) continue;
+      let stat;
+      try {
+        stat = fs.statSync(path.join(this.root, relative));
+      } catch (error) {
+        if (error.code !== 'ENOENT') throw error;
+        if (this.state.has(relative)) deleted.push(relative);
+        continue;
+      }
+      if (!stat.isFile()) continue;
+      seen.add(relative);
+      const known = this.state.get(relative);
+      if (sameStat(known, stat, path.join(this.root, relative))) continue;
+      const entry = this._captureFile(relative, stat);
+      if (known && known.chunks.join() === entry.chunks.join() && known.mode === entry.mode) {
+        // Touched but identical: refresh the stat so the next scan skips it
+        this.state.set(relative, entry);
+        continue;
+      }
+      files[relative] = entry;
+    }
+    if (!changed) {
+      for (const relative of this.state.keys()) if (!seen.has(relative)) deleted.push(relative);
+    }
+
+    const parent = this._head();
+    const sinceFull = parent ? parent.sinceFull + 1 : 0;
+    const full = !parent || sinceFull >= this.options.fullEvery;
+    for (const relative of deleted) this.state.delete(relative);
+    for (const [relative, entry] of Object.entries(files)) this.state.set(relative, entry);
+
+    const id = `cp-${String(this.index.next++).padStart(6, '0')}`;
+    const manifest = {
+      id,
+      label,
+      parent: parent ? parent.id : null,
+      full,
+      createdAt: new Date().toISOString(),
+      files: full ? Object.fromEntries(this.state) : files,
+      deleted: full ? [] : deleted
+    };
+    fs.writeFileSync(this._manifestPath(id), JSON.stringify(manifest));
+    if (full) this.lastFull = manifest;
+    this.index.checkpoints.push({ id, label, parent: manifest.parent, createdAt: manifest.createdAt,
+      sinceFull: full ? 0 : sinceFull, changed: Object.keys(files).length, deleted: deleted.length });
+    this.index.head = id;
+    this._saveIndex();
+    return id;
+  }
+
+  // ---------------------------------------------------------------- restore
+
+  _readChunk(hash) {
+    return fs.readFileSync(this._objectPath(hash));
+  }
+
+  // Rebuilds a database snapshot and restores it through the backup API, so
+  // its WAL and shared-memory files stay consistent
+  _restoreSqlite(relative, target) {
+    const full = path.join(this.root, relative);
+    const snapshot = this._tempPath();
+    try {
+      fs.writeFileSync(snapshot, Buffer.concat(target.chunks.map(hash => this._readChunk(hash))));
+      if (fs.existsSync(full)) {
+        this.options.sqliteRestore(snapshot, full);
+      } else {
+        removeSqliteSideFiles(full);
+        fs.mkdirSync(path.dirname(full), { recursive: true });
+        fs.copyFileSync(snapshot, full);
+      }
+    } finally {
+      fs.rmSync(snapshot, { force: true });
+    }
+    fs.chmodSync(full, target.mode & 0o7777);
+    const stat = fs.statSync(full);
+    this.state.set(relative, { ...target, size: stat.size, mtimeMs: stat.mtimeMs, ino: stat.ino, wal: walStamp(full) });
+    return target.chunks.length;
+  }
+
+  // Writes only the chunks of `target` that differ from `current`
+  _restoreFile(relative, target, current) {
+    if (target.sqlite) return this._restoreSqlite(relative, target);
+    const full = path.join(this.root, relative);
+    if (current && current.sqlite) removeSqliteSideFiles(full);
+    const sameLayout = current && current.layout.first === target.layout.first &&
+      current.layout.size === target.layout.size;
+    let written = 0;
+    if (sameLayout && fs.existsSync(full)) {
+      const fd = fs.openSync(full, 'r+');
+      try {
+        target.chunks.forEach((hash, index) => {
+          if (current.chunks[index] === hash) return;
+          const buffer = this._readChunk(hash);
+          fs.writeSync(fd, buffer, 0, buffer.length, chunkOffset(target.layout, index));
+          written++;
+        });
+        fs.ftruncateSync(fd, target.size);
+      } finally {
+        fs.closeSync(fd);
+      }
+    } else {
+      fs.mkdirSync(path.dirname(full), { recursive: true });
+      fs.writeFileSync(full, Buffer.concat(target.chunks.map(hash => this._readChunk(hash))));
+      written = target.chunks.length;
+    }
+    fs.chmodSync(full, target.mode & 0o7777);
+    const stat = fs.statSync(full);
+    this.state.set(relative, { ...target, mtimeMs: stat.mtimeMs, ino: stat.ino });
+    return written;
+  }
+
+  // Brings the working tree back to checkpoint `id`. Files changed since the
+  // last checkpoint or restore are picked up first so they are rolled back
+  // too; pass `changed` to limit that scan as in checkpoint().
+  restore(id, { changed } = {}) {
+    if (!fs.existsSync(this._manifestPath(id))) throw new Error(`Unknown checkpoint "${id}"`);
+    this._refreshState(changed);
+    const target = this._materialize(id);
+    let filesWritten = 0;
+    let chunksWritten = 0;
+    let filesDeleted = 0;
+
+    for (const [relative, entry] of target) {
+      const current = this.state.get(relative);
+      if (current && current.chunks.join() === entry.chunks.join()) {
+        if (current.mode !== entry.mode) fs.chmodSync(path.join(this.root, relative), entry.mode & 0o7777);
+        continue;
+      }
+      chunksWritten += this._restoreFile(relative, entry, current);
+      filesWritten++;
+    }
+    for (const relative of [...this.state.keys()]) {
+      if (target.has(relative)) continue;
+      fs.rmSync(path.join(this.root, relative), { force: true });
+      if (this.state.get(relative).sqlite) removeSqliteSideFiles(path.join(this.root, relative));
+      this.state.delete(relative);
+      filesDeleted++;
+    }
+    // Checkpoints taken after a rollback branch off the restored one
+    this.index.head = id;
+    this._saveIndex();
+    return { filesWritten, chunksWritten, filesDeleted };
+  }
+
+  // Updates the in-memory state to match the working tree without writing a
+  // checkpoint
+  _refreshState(changed) {
+    const candidates = this._candidates(changed);
+    const seen = new Set();
+    for (const relative of candidates) {
+      if (this._isExcluded(relative)) continue;
+      const full = path.join(this.root, relative);
+      if (!fs.existsSync(full)) {
+        if (!changed) continue;
+        this.state.delete(relative);
+        continue;
+      }
+      const stat = fs.statSync(full);
+      if (!stat.isFile()) continue;
+      seen.add(relative);
+      if (!sameStat(this.state.get(relative), stat, full)) this.state.set(relative, this._captureFile(relative, stat));
+    }
+    if (!changed) {
+      for (const relative of [...this.state.keys()]) if (!seen.has(relative)) this.state.delete(relative);
+    }
+  }
+
+  list() {
+    return this.index.checkpoints.map(({ id, label, parent, createdAt, changed, deleted }) =>
+      ({ id, label, parent, createdAt, changed, deleted }));
+  }
+}
+
+// ------------------------------------------------------------------ benchmark
+
+function time(fn) {
+  const start = process.hrtime.bigint();
+  const result = fn();
+  return { ms: Number(process.hrtime.bigint() - start) / 1e6, result };
+}
+
+// A generated project: `files` source files plus a SQLite database in WAL
+// mode with roughly one row per page
+function buildTree(root, files, dbPages) {
+  for (let i = 0; i < files; i++) {
+    const dir = path.join(root, 'src', `module-${Math.floor(i / 500)}`);
+    if (i % 500 === 0) fs.mkdirSync(dir, { recursive: true });
+    const body = `// generated file ${i}\n` + `export const value${i} = ${i};\n`.repeat(20 + (i % 40));
+    fs.writeFileSync(path.join(dir, `file-${i}.js`), body);
+  }
+  fs.mkdirSync(path.join(root, 'data'), { recursive: true });
+  execFileSync('sqlite3', [path.join(root, 'data', 'app.sqlite'),
+    'PRAGMA page_size = 4096; PRAGMA journal_mode = WAL; CREATE TABLE rows (id INTEGER PRIMARY KEY, body BLOB); ' +
+    `WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ${dbPages}) ` +
+    'INSERT INTO rows SELECT i, zeroblob(3000) FROM n;']);
+}
+
+// What a TDD step does: edit a few files, add one, update a few DB rows
+function simulateStep(root, step, { edits = 20, dbWrites = 10 } = {}) {
+  const touched = [];
+  for (let e = 0; e < edits; e++) {
+    const i = (step * 997 + e * 131) % 1000;
+    const relative = path.join('src', `module-${Math.floor(i / 500)}`, `file-${i}.js`);
+    fs.appendFileSync(path.join(root, relative), `// step ${step} edit ${e}\n`);
+    touched.push(relative);
+  }
+  const added = path.join('src', `step-${step}.test.js`);
+  fs.writeFileSync(path.join(root, added), `test('step ${step}', () => {});\n`);
+  touched.push(added);
+  const ids = Array.from({ length: dbWrites }, (_, w) => (step * 37 + w * 11) % 2000 + 1);
+  execFileSync('sqlite3', [path.join(root, 'data', 'app.sqlite'),
+    `UPDATE rows SET body = randomblob(3000) WHERE id IN (${ids.join(', ')});`]);
+  touched.push(path.join('data', 'app.sqlite'));
+  return touched;
+}
+
+function runBenchmark({ files = 50000, dbPages = 5000, steps = 5 } = {}) {
+  const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'checkpoint-bench-'));
+  const root = path.join(workDir, 'project');
+  buildTree(root, files, dbPages);
+  const rows = [];
+
+  // Current approach: copy the whole tree before every step, copy it back on rollback
+  const fullDir = path.join(workDir, 'full');
+  const fullCheckpoint = time(() => fs.cpSync(root, path.join(fullDir, 'step-0'), { recursive: true }));
+  simulateStep(root, 0);
+  const fullRollback = time(() => {
+    fs.rmSync(root, { recursive: true, force: true });
+    fs.cpSync(path.join(fullDir, 'step-0'), root, { recursive: true });
+  });
+  rows.push({ approach: 'full copy', 'initial ms': fullCheckpoint.ms.toFixed(0), 'step checkpoint ms': fullCheckpoint.ms.toFixed(0),
+    'step checkpoint (hinted) ms': '-', 'rollback ms': fullRollback.ms.toFixed(0) });
+  fs.rmSync(fullDir, { recursive: true, force: true });
+
+  const store = CheckpointStore.open(path.join(workDir, 'store'), root);
+  const initial = time(() => store.checkpoint('baseline'));
+  let walked = 0;
+  let hinted = 0;
+  let base = initial.result;
+  for (let step = 1; step <= steps; step++) {
+    simulateStep(root, step);
+    walked += time(() => store.checkpoint(`step ${step} (walk)`)).ms;
+    const touched = simulateStep(root, step + 1000);
+    const hintedRun = time(() => store.checkpoint(`step ${step} (hinted)`, { changed: touched }));
+    hinted += hintedRun.ms;
+    base = hintedRun.result;
+  }
+  const touched = simulateStep(root, 9999);
+  const rollback = time(() => store.restore(base, { changed: touched }));
+  rows.push({ approach: 'incremental CAS', 'initial ms': initial.ms.toFixed(0), 'step checkpoint ms': (walked / steps).toFixed(0),
+    'step checkpoint (hinted) ms': (hinted / steps).toFixed(1), 'rollback ms': rollback.ms.toFixed(1) });
+
+  console.table(rows);
+  console.log(`\n🧱 Rollback rewrote ${rollback.result.filesWritten} files (${rollback.result.chunksWritten} chunks), ` +
+    `deleted ${rollback.result.filesDeleted}`);
+  console.log(`📦 ${store.counters.chunksWritten} chunks stored, ${store.counters.chunksReused} deduplicated`);
+  fs.rmSync(workDir, { recursive: true, force: true });
+}
+
+if (require.main === module) {
+  console.log('💾 Checkpoint benchmark (full copy vs incremental content-addressed store, 50k files)\n');
+  runBenchmark();
+}
+
+module.exports = { CheckpointStore };
@@ -0,0 +1,629 @@
+const crypto = require('crypto');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const readline = require('readline');
+
+// Streaming, chunked index for the external documentation in docs/external.
+//
+// Documents are read line by line and cut into chunks at headings (never
+// inside a code fence), so no document is ever held in memory whole. Each
+// chunk gets a short extractive summary and its terms go into an inverted
+// index. The index is stored as immutable segment files: a fixed-width chunk
+// table, a summary blob, a sorted term dictionary and postings. A segment is
+// read with one read into a single buffer and queried in place, so opening
+// the index is cheap and a query decodes only the terms it asks for.
+//
+// Updates are incremental: unchanged files are skipped by size/mtime, changed
+// ones are re-hashed while they are re-chunked. Only new or changed documents
+// go into a new segment; their old chunks are tombstoned. Small segments are
+// merged from their postings, without re-reading any document. search()
+// ranks chunks with BM25 and readChunk() streams just the lines of a hit.
+
+const MANIFEST_FILE = 'manifest.json';
+const INDEX_VERSION = 1;
+const SEGMENT_MAGIC = 'DIX1';
+const SEGMENT_FILE = /^segment-\d{6}\.idx(\.tmp)?$/;
+const CHUNK_RECORD_BYTES = 24;
+const POSTING_BYTES = 8;
+
+const DEFAULT_OPTIONS = {
+  minChunkLines: 20,
+  maxChunkLines: 150,
+  summarySentences: 2,
+  summaryKeywords: 8,
+  segmentChunks: 2000,
+  maxSegments: 16,
+  k1: 1.2,
+  b: 0.75
+};
+
+const STOPWORDS = new Set(('a an and are as at be but by can do does for from has have how if in into is it its ' +
+  'not of on or that the their then there these this to was were will with you your we our use used using').split(' '));
+
+function tokenize(text) {
+  const tokens = [];
+  for (const raw of text.toLowerCase().split(/[^a-z0-9_]+/)) {
+    if (raw.length < 2 || raw.length > 40 || STOPWORDS.has(raw)) continue;
+    tokens.push(raw);
+  }
+  return tokens;
+}
+
+function segmentName(id) {
+  return `segment-${String(id).padStart(6, '0')}.idx`;
+}
+
+// ----------------------------------------------------------------- chunking
+
+// Default summarizer: heading trail, the first sentences of prose and the
+// chunk's most frequent terms. Swap in CONTENT_SUMMARIZER via options.summarize.
+function summarizeChunk({ headings, prose, termCounts }, options) {
+  const sentences = prose.join(' ').replace(/\s+/g, ' ').match(/[^.!?]+[.!?]?/g) || [];
+  const lead = sentences.slice(0, options.summarySentences).map(sentence => sentence.trim()).join(' ');
+  const keywords = [...termCounts].sort((a, b) => b[1] - a[1]).slice(0, options.summaryKeywords).map(([term]) => term);
+  return [headings.filter(Boolean).join(' › '), lead, keywords.length ? `[${keywords.join(', ')}]` : '']
+    .filter(Boolean).join(' — ').slice(0, 600);
+}
+
+// Streams one Markdown file into chunks; returns { hash, chunks }
+async function chunkDocument(filePath, options) {
+  const hash = crypto.createHash('sha256');
+  const chunks = [];
+  const headings = [];
+  let current = null;
+  let inFence = false;
+  let lineNumber = 0;
+
+  const start = () => ({ startLine: lineNumber, headings: headings.slice(), prose: [], termCounts: new Map(), length: 0 });
+  const close = () => {
+    if (!current || current.length === 0) return;
+    current.endLine = lineNumber - 1;
+    current.summary = (options.summarize || summarizeChunk)(current, options);
+    chunks.push({ startLine: current.startLine, endLine: current.endLine, summary: current.summary,
+      termCounts: current.termCounts, length: current.length });
+  };
+
+  const lines = readline.createInterface({ input: fs.createReadStream(filePath), crlfDelay: Infinity });
+  for await (const line of lines) {
+    lineNumber++;
+    hash.update(line).update('\n');
+    if (/^\s*(```|~~~)/.test(line)) inFence = !inFence;
+    const heading = inFence ? null : /^(#{1,6})\s+(.*)$/.exec(line);
+    const size = current ? lineNumber - current.startLine : 0;
+    if (!current || (heading && size >= options.minChunkLines) || (!inFence && size >= options.maxChunkLines)) {
+      close();
+      if (heading) headings.splice(heading[1].length - 1, Infinity, heading[2].trim());
+      current = start();
+    } else if (heading) {
+      headings.splice(heading[1].length - 1, Infinity, heading[2].trim());
+      if (current.headings.length === 0) current.headings = headings.slice();
+    }
+    for (const term of tokenize(line)) {
+      current.termCounts.set(term, (current.termCounts.get(term) || 0) + 1);
+      current.length++;
+    }
+    // Headings count twice: they describe the whole chunk
+    if (heading) for (const term of tokenize(heading[2])) current.termCounts.set(term, current.termCounts.get(term) + 1);
+    if (!inFence && !heading && current.prose.length < 8 && /\w/.test(line) && !/^\s*([-*|>]|\d+\.)/.test(line)) {
+      current.prose.push(line.trim());
+    }
+  }
+  lineNumber++;
+  close();
+  return { hash: hash.digest('hex'), chunks };
+}
+
+// ------------------------------------------------------------------ segments
+
+// Layout: "DIX1" | u32 headerBytes | JSON header | chunk table (24 B each) |
+// summaries | term offsets (u32 × terms+1) | terms ("\n"-joined, sorted) |
+// posting offsets (u32 × terms+1) | postings ({u32 chunk, u32 tf} each)
+function writeSegment(filePath, docs, chunks) {
+  const terms = new Map();
+  chunks.forEach((chunk, local) => {
+    for (const [term, tf] of chunk.termCounts) {
+      if (!terms.has(term)) terms.set(term, []);
+      terms.get(term).push(local, tf);
+    }
+  });
+  const sortedTerms = [...terms.keys()].sort();
+
+  const table = Buffer.alloc(chunks.length * CHUNK_RECORD_BYTES);
+  const summaries = [];
+  let summaryOffset = 0;
+  chunks.forEach((chunk, local) => {
+    const summary = Buffer.from(chunk.summary, 'utf8');
+    const at = local * CHUNK_RECORD_BYTES;
+    table.writeUInt32LE(chunk.doc, at);
+    table.writeUInt32LE(chunk.startLine, at + 4);
+    table.writeUInt32LE(chunk.endLine, at + 8);
+    table.writeUInt32LE(summaryOffset, at + 12);
+    table.writeUInt32LE(summary.length, at + 16);
+    table.writeUInt32LE(chunk.length, at + 20);
+    summaries.push(summary);
+    summaryOffset += summary.length;
+  });
+
+  const termBlob = Buffer.from(sortedTerms.join('\n'), 'utf8');
+  const termOffsets = Buffer.alloc((sortedTerms.length + 1) * 4);
+  const postingOffsets = Buffer.alloc((sortedTerms.length + 1) * 4);
+  let byteOffset = 0;
+  let postingCount = 0;
+  sortedTerms.forEach((term, i) => {
+    termOffsets.writeUInt32LE(byteOffset, i * 4);
+    byteOffset += Buffer.byteLength(term, 'utf8') + 1;
+    postingOffsets.writeUInt32LE(postingCount, i * 4);
+    postingCount += terms.get(term).length / 2;
+  });
+  termOffsets.writeUInt32LE(byteOffset, sortedTerms.length * 4);
+  postingOffsets.writeUInt32LE(postingCount, sortedTerms.length * 4);
+  const postings = Buffer.alloc(postingCount * POSTING_BYTES);
+  let at = 0;
+  for (const term of sortedTerms) {
+    for (const value of terms.get(term)) {
+      postings.writeUInt32LE(value, at);
+      at += 4;
+    }
+  }
+
+  const sections = [table, Buffer.concat(summaries), termOffsets, termBlob, postingOffsets, postings];
+  const offsets = {};
+  let position = 0;
+  ['chunks', 'summaries', 'termOffsets', 'terms', 'postingOffsets', 'postings'].forEach((name, i) => {
+    offsets[name] = position;
+    position += sections[i].length;
+  });
+  const header = Buffer.from(JSON.stringify({ docs, chunkCount: chunks.length, termCount: sortedTerms.length, offsets }), 'utf8');
+  const prefix = Buffer.alloc(8);
+  prefix.write(SEGMENT_MAGIC, 0, 'latin1');
+  prefix.writeUInt32LE(header.length, 4);
+  fs.writeFileSync(`${filePath}.tmp`, Buffer.concat([prefix, header, ...sections]));
+  fs.renameSync(`${filePath}.tmp`, filePath);
+}
+
+class Segment {
+  constructor(filePath) {
+    const size = fs.statSync(filePath).size;
+    this.buffer = Buffer.allocUnsafe(size);
+    const fd = fs.openSync(filePath, 'r');
+    try {
+      fs.readSync(fd, this.buffer, 0, size, 0);
+    } finally {
+      fs.closeSync(fd);
+    }
+    if (this.buffer.toString('latin1', 0, 4) !== SEGMENT_MAGIC) throw new Error(`${filePath} is not a doc index segment`);
+    const headerBytes = this.buffer.readUInt32LE(4);
+    this.header = JSON.parse(this.buffer.toString('utf8', 8, 8 + headerBytes));
+    this.base = 8 + headerBytes;
+  }
+
+  get chunkCount() {
+    return this.header.chunkCount;
+  }
+
+  chunk(local) {
+    const at = this.base + this.header.offsets.chunks + local * CHUNK_RECORD_BYTES;
+    const summaryStart = this.base + this.header.offsets.summaries + this.buffer.readUInt32LE(at + 12);
+    return {
+      path: this.header.docs[this.buffer.readUInt32LE(at)],
+      startLine: this.buffer.readUInt32LE(at + 4),
+      endLine: this.buffer.readUInt32LE(at + 8),
+      summary: this.buffer.toString('utf8', summaryStart, summaryStart + this.buffer.readUInt32LE(at + 16)),
+      length: this.buffer.readUInt32LE(at + 20)
+    };
+  }
+
+  chunkLength(local) {
+    return this.buffer.readUInt32LE(this.base + this.header.offsets.chunks + local * CHUNK_RECORD_BYTES + 20);
+  }
+
+  _term(i) {
+    const offsets = this.base + this.header.offsets.termOffsets;
+    const blob = this.base + this.header.offsets.terms;
+    const start = this.buffer.readUInt32LE(offsets + i * 4);
+    const end = this.buffer.readUInt32LE(offsets + (i + 1) * 4) - 1;
+    return this.buffer.toString('utf8', blob + start, blob + Math.max(start, end));
+  }
+
+  // Binary search over the sorted dictionary, decoding only probed terms
+  _findTerm(term) {
+    let low = 0;
+    let high = this.header.termCount - 1;
+    while (low <= high) {
+      const middle = (low + high) >> 1;
+      const probe = this._term(middle);
+      if (probe === term) return middle;
+      if (probe < term) low = middle + 1;
+      else high = middle - 1;
+    }
+    return -1;
+  }
+
+  // [[local, tf], ...] for one term
+  postings(term) {
+    const index = this._findTerm(term);
+    if (index === -1) return [];
+    const offsets = this.base + this.header.offsets.postingOffsets;
+    const from = this.buffer.readUInt32LE(offsets + index * 4);
+    const to = this.buffer.readUInt32LE(offsets + (index + 1) * 4);
+    const base = this.base + this.header.offsets.postings;
+    const result = [];
+    for (let p = from; p < to; p++) {
+      result.push([this.buffer.readUInt32LE(base + p * POSTING_BYTES), this.buffer.readUInt32LE(base + p * POSTING_BYTES + 4)]);
+    }
+    return result;
+  }
+
+  // Every term with its postings, for merging
+  *entries() {
+    for (let i = 0; i < this.header.termCount; i++) {
+      const term = this._term(i);
+      yield [term, this.postings(term)];
+    }
+  }
+}
+
+// --------------------------------------------------------------------- index
+
+// Relative paths of Markdown files; skips .index.md and the index directory
+function* walkMarkdown(root, dir = root) {
+  for (const dirent of fs.readdirSync(dir, { withFileTypes: true })) {
+    if (dirent.name.startsWith('.')) continue;
+    const full = path.join(dir, dirent.name);
+    if (dirent.isDirectory()) yield* walkMarkdown(root, full);
+    else if (dirent.isFile() && /\.(md|markdown)$/i.test(dirent.name)) yield path.relative(root, full);
+  }
+}
+
+class DocIndex {
+  constructor(docsDir, indexDir = path.join(docsDir, '.doc_index'), options = {}) {
+    this.docsDir = path.resolve(docsDir);
+    this.indexDir = indexDir;
+    this.options = { ...DEFAULT_OPTIONS, ...options };
+    this.manifest = { version: INDEX_VERSION, nextSegment: 1, segments: [], docs: {}, deleted: {}, totals: { chunks: 0, tokens: 0 } };
+    this.segments = new Map();
+  }
+
+  static open(docsDir, indexDir, options) {
+    const index = new DocIndex(docsDir, indexDir, options);
+    const manifestPath = path.join(index.indexDir, MANIFEST_FILE);
+    if (fs.existsSync(manifestPath)) {
+      const manifest = JSON.parse(fs.readFileSync(manifestPath, 'utf8'));
+      if (manifest.version === INDEX_VERSION) index.manifest = manifest;
+    }
+    return index;
+  }
+
+  _saveManifest() {
+    fs.mkdirSync(this.indexDir, { recursive: true });
+    const target = path.join(this.indexDir, MANIFEST_FILE);
+    fs.writeFileSync(`${target}.tmp`, JSON.stringify(this.manifest));
+    fs.renameSync(`${target}.tmp`, target);
+  }
+
+  _segment(name) {
+    if (!this.segments.has(name)) this.segments.set(name, new Segment(path.join(this.indexDir, name)));
+    return this.segments.get(name);
+  }
+
+  _tombstone(relative) {
+    const doc = this.manifest.docs[relative];
+    if (!doc) return;
+    const deleted = this.manifest.deleted[doc.segment] || (this.manifest.deleted[doc.segment] = []);
+    for (let local = doc.firstChunk; local < doc.firstChunk + doc.chunkCount; local++) deleted.push(local);
+    this.manifest.totals.chunks -= doc.chunkCount;
+    this.manifest.totals.tokens -= doc.tokens;
+    delete this.manifest.docs[relative];
+  }
+
+  // Indexes new and changed documents and drops deleted ones. Returns what changed.
+  async update() {
+    fs.mkdirSync(this.indexDir, { recursive: true });
+    const seen = new Set();
+    const pending = [];
+    let pendingChunks = 0;
+    let added = 0;
+    let unchanged = 0;
+
+    for (const relative of walkMarkdown(this.docsDir)) {
+      seen.add(relative);
+      const stat = fs.statSync(path.join(this.docsDir, relative));
+      const known = this.manifest.docs[relative];
+      if (known && known.size === stat.size && known.mtimeMs === stat.mtimeMs) {
+        unchanged++;
+        continue;
+      }
+      const { hash, chunks } = await chunkDocument(path.join(this.docsDir, relative), this.options);
+      if (known && known.hash === hash) {
+        known.size = stat.size;
+        known.mtimeMs = stat.mtimeMs;
+        unchanged++;
+        continue;
+      }
+      pending.push({ relative, hash, stat, chunks });
+      pendingChunks += chunks.length;
+      added++;
+      // Bounded memory: large rebuilds are written as several segments
+      if (pendingChunks >= this.options.segmentChunks) {
+        this._flush(pending.splice(0));
+        pendingChunks = 0;
+      }
+    }
+    const removed = Object.keys(this.manifest.docs).filter(relative => !seen.has(relative));
+    for (const relative of removed) this._tombstone(relative);
+
+    this._flush(pending);
+    if (this.manifest.segments.length > this.options.maxSegments) this._merge();
+    this._dropEmptySegments();
+    // Segment files are only deleted once the manifest no longer names them
+    this._saveManifest();
+    this._removeUnreferencedSegments();
+    return { added, removed: removed.length, unchanged };
+  }
+
+  // Writes the pending documents as one new segment
+  _flush(pending) {
+    if (pending.length === 0) return;
+    const name = segmentName(this.manifest.nextSegment++);
+    const docs = [];
+    const chunks = [];
+    for (const { relative, hash, stat, chunks: docChunks } of pending) {
+      this._tombstone(relative);
+      const doc = docs.push(relative) - 1;
+      const tokens = docChunks.reduce((sum, chunk) => sum + chunk.length, 0);
+      this.manifest.docs[relative] = { hash, size: stat.size, mtimeMs: stat.mtimeMs, segment: name,
+        firstChunk: chunks.length, chunkCount: docChunks.length, tokens };
+      this.manifest.totals.chunks += docChunks.length;
+      this.manifest.totals.tokens += tokens;
+      for (const chunk of docChunks) chunks.push({ ...chunk, doc });
+    }
+    writeSegment(path.join(this.indexDir, name), docs, chunks);
+    this.manifest.segments.push(name);
+  }
+
+  _dropEmptySegments() {
+    const live = new Set(Object.values(this.manifest.docs).map(doc => doc.segment));
+    for (const name of this.manifest.segments.filter(segment => !live.has(segment))) {
+      this.segments.delete(name);
+      delete this.manifest.deleted[name];
+    }
+    this.manifest.segments = this.manifest.segments.filter(segment => live.has(segment));
+  }
+
+  // Also sweeps segments left behind by an update that died before or after
+  // saving its manifest
+  _removeUnreferencedSegments() {
+    const referenced = new Set(this.manifest.segments);
+    for (const name of fs.readdirSync(this.indexDir)) {
+      if (SEGMENT_FILE.test(name) && !referenced.has(name)) fs.rmSync(path.join(this.indexDir, name), { force: true });
+    }
+  }
+
+  // Rewrites all live chunks into one segment from the stored postings
+  _merge() {
+    const name = segmentName(this.manifest.nextSegment++);
+    const docs = [];
+    const docIndex = new Map();
+    const chunks = [];
+    const remap = new Map();
+    for (const segmentName of this.manifest.segments) {
+      const segment = this._segment(segmentName);
+      const deleted = new Set(this.manifest.deleted[segmentName] || []);
+      for (let local = 0; local < segment.chunkCount; local++) {
+        if (deleted.has(local)) continue;
+        const chunk = segment.chunk(local);
+        if (!docIndex.has(chunk.path)) docIndex.set(chunk.path, docs.push(chunk.path) - 1);
+        remap.set(`${segmentName}:${local}`, chunks.length);
+        chunks.push({ ...chunk, doc: docIndex.get(chunk.path), termCounts: new Map() });
+      }
+      for (const [term, postings] of segment.entries()) {
+        for (const [local, tf] of postings) {
+          const target = remap.get(`${segmentName}:${local}`);
+          if (target !== undefined) chunks[target].termCounts.set(term, tf);
+        }
+      }
+    }
+    // Chunks of one document stay contiguous, in their original order
+    const order = chunks.map((chunk, i) => i).sort((a, b) => chunks[a].doc - chunks[b].doc || a - b);
+    const ordered = order.map(i => chunks[i]);
+    writeSegment(path.join(this.indexDir, name), docs, ordered);
+    const firstChunk = new Map();
+    ordered.forEach((chunk, i) => { if (!firstChunk.has(chunk.doc)) firstChunk.set(chunk.doc, i); });
+    for (const [relative, doc] of Object.entries(this.manifest.docs)) {
+      doc.segment = name;
+      doc.firstChunk = firstChunk.get(docIndex.get(relative));
+    }
+    for (const old of this.manifest.segments) this.segments.delete(old);
+    this.manifest.segments = [name];
+    this.manifest.deleted = {};
+  }
+
+  // ----------------------------------------------------------------- search
+
+  // BM25 over live chunks; document frequency counts tombstoned chunks until
+  // the next merge, which only slightly damps scores of edited documents
+  search(query, { k = 5 } = {}) {
+    const terms = [...new Set(tokenize(query))];
+    const total = Math.max(1, this.manifest.totals.chunks);
+    const averageLength = this.manifest.totals.tokens / total || 1;
+    const { k1, b } = this.options;
+    const scores = new Map();
+    const perSegment = this.manifest.segments.map(name => ({ name, segment: this._segment(name),
+      deleted: new Set(this.manifest.deleted[name] || []) }));
+
+    for (const term of terms) {
+      const lists = perSegment.map(entry => ({ ...entry, postings: entry.segment.postings(term) }));
+      const df = lists.reduce((sum, entry) => sum + entry.postings.length, 0);
+      if (df === 0) continue;
+      const idf = Math.log(1 + (total - df + 0.5) / (df + 0.5));
+      for (const { name, segment, deleted, postings } of lists) {
+        for (const [local, tf] of postings) {
+          if (deleted.has(local)) continue;
+          const length = segment.chunkLength(local);
+          const score = idf * (tf * (k1 + 1)) / (tf + k1 * (1 - b + b * length / averageLength));
+          const key = `${name}:${local}`;
+          scores.set(key, (scores.get(key) || 0) + score);
+        }
+      }
+    }
+    return [...scores].sort((a, c) => c[1] - a[1]).slice(0, k).map(([key, score]) => {
+      const [name, local] = key.split(':');
+      return { ...this._segment(name).chunk(Number(local)), score };
+    });
+  }
+
+  // Streams only the lines of one search hit from its source document
+  async readChunk(hit) {
+    const lines = [];
+    let lineNumber = 0;
+    const stream = fs.createReadStream(path.join(this.docsDir, hit.path));
+    const reader = readline.createInterface({ input: stream, crlfDelay: Infinity });
+    for await (const line of reader) {
+      lineNumber++;
+      if (lineNumber < hit.startLine) continue;
+      if (lineNumber > hit.endLine) break;
+      lines.push(line);
+    }
+    reader.close();
+    stream.destroy();
+    return lines.join('\n');
+  }
+
+  stats() {
+    const bytes = this.manifest.segments.reduce((sum, name) => sum + fs.statSync(path.join(this.indexDir, name)).size, 0);
+    return { documents: Object.keys(this.manifest.docs).length, ...this.manifest.totals,
+      segments: this.manifest.segments.length, indexBytes: bytes };
+  }
+}
+
+// ------------------------------------------------------------------ benchmark
+
+const TOPICS = ['react', 'hooks', 'state', 'router', 'trpc', 'socket', 'sqlite', 'migration', 'docker', 'compose',
+  'puppeteer', 'screenshot', 'tailwind', 'typescript', 'vite', 'express', 'middleware', 'auth', 'jwt', 'session',
+  'kanban', 'websocket', 'cache', 'index', 'query', 'schema', 'deploy', 'testing', 'jest', 'coverage'];
+
+function syntheticCorpus(dir, files, seed = 5) {
+  let state = seed;
+  const random = () => {
+    state = (Math.imul(state, 1664525) + 1013904223) >>> 0;
+    return state / 0x100000000;
+  };
+  // Zipf-ish vocabulary so some terms are common and most are rare
+  const vocabulary = Array.from({ length: 20000 }, (_, i) => `term${i.toString(36)}`);
+  const word = () => vocabulary[Math.floor(vocabulary.length * random() ** 3)];
+  const sentence = topic => `${topic} ${Array.from({ length: 12 }, word).join(' ')}.`;
+  for (let f = 0; f < files; f++) {
+    const topic = TOPICS[f % TOPICS.length];
+    const subdir = path.join(dir, topic);
+    if (f < TOPICS.length) fs.mkdirSync(subdir, { recursive: true });
+    const lines = [`# ${topic} guide ${f}`, ''];
+    const sections = 4 + Math.floor(random() * 12);
+    for (let s = 0; s < sections; s++) {
+      lines.push(`## ${topic} ${TOPICS[Math.floor(random() * TOPICS.length)]} section ${s}`, '');
+      for (let p = 0; p < 3; p++) lines.push(sentence(topic), sentence(TOPICS[Math.floor(random() * TOPICS.length)]), '');
+      lines.push('```js', `const ${topic} = require('${topic}');`, '```', '');
+    }
+    fs.writeFileSync(path.join(subdir, `doc-${f}.md`), lines.join('\n'));
+  }
+}
+
+function percentile(sorted, p) {
+  return sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+}
+
+async function runBenchmark({ files = 4000, queries = 200 } = {}) {
+  const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'doc-index-bench-'));
+  const docsDir = path.join(workDir, 'external');
+  syntheticCorpus(docsDir, files);
+  const queryTexts = Array.from({ length: queries }, (_, q) =>
+    `${TOPICS[q % TOPICS.length]} ${TOPICS[(q * 7) % TOPICS.length]} term${(q * 13).toString(36)}`);
+
+  const heapBefore = process.memoryUsage().heapUsed;
+  let peakHeap = heapBefore;
+  const sampler = setInterval(() => { peakHeap = Math.max(peakHeap, process.memoryUsage().heapUsed); }, 5);
+  let start = Date.now();
+  const index = DocIndex.open(docsDir, path.join(workDir, 'index'));
+  await index.update();
+  const buildMs = Date.now() - start;
+  clearInterval(sampler);
+
+  // Current approach: load every document whole and scan it
+  const baselineSamples = [];
+  for (const text of queryTexts.slice(0, 10)) {
+    const start = process.hrtime.bigint();
+    const terms = tokenize(text);
+    let best = null;
+    for (const relative of walkMarkdown(docsDir)) {
+      const body = fs.readFileSync(path.join(docsDir, relative), 'utf8').toLowerCase();
+      const score = terms.reduce((sum, term) => sum + body.split(term).length - 1, 0);
+      if (!best || score > best.score) best = { relative, score };
+    }
+    baselineSamples.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  baselineSamples.sort((a, b) => a - b);
+
+  // Incremental update: edit 20 documents
+  for (let f = 0; f < 20; f++) {
+    fs.appendFileSync(path.join(docsDir, TOPICS[f % TOPICS.length], `doc-${f}.md`), '\n## Added section\n\nNew websocket notes.\n');
+  }
+  start = Date.now();
+  const updated = await index.update();
+  const updateMs = Date.now() - start;
+
+  start = Date.now();
+  const reopened = DocIndex.open(docsDir, path.join(workDir, 'index'));
+  reopened.search('warm up');
+  const openMs = Date.now() - start;
+  const samples = queryTexts.map(text => {
+    const queryStart = process.hrtime.bigint();
+    reopened.search(text, { k: 5 });
+    return Number(process.hrtime.bigint() - queryStart) / 1e6;
+  }).sort((a, b) => a - b);
+  const [top] = reopened.search(queryTexts[0], { k: 1 });
+  const excerpt = top ? await reopened.readChunk(top) : '';
+  const stats = reopened.stats();
+
+  console.table([{
+    documents: stats.documents,
+    chunks: stats.chunks,
+    'build ms': buildMs,
+    'peak heap MB': ((peakHeap - heapBefore) / 1e6).toFixed(1),
+    'index MB': (stats.indexBytes / 1e6).toFixed(1),
+    'update ms (20 docs)': updateMs,
+    'open ms': openMs
+  }]);
+  console.table([
+    { retrieval: 'load + scan every document', 'p50 ms': percentile(baselineSamples, 0.5).toFixed(1), 'p99 ms': percentile(baselineSamples, 0.99).toFixed(1) },
+    { retrieval: 'indexed top-5 chunks', 'p50 ms': percentile(samples, 0.5).toFixed(2), 'p99 ms': percentile(samples, 0.99).toFixed(2) }
+  ]);
+  console.log(`\n🔁 Incremental update re-indexed ${updated.added} documents, skipped ${updated.unchanged}`);
+  console.log(`📄 Top hit for "${queryTexts[0]}": ${top ? `${top.path}:${top.startLine}-${top.endLine}` : 'none'} ` +
+    `(${excerpt.split('\n').length} lines streamed)`);
+  fs.rmSync(workDir, { recursive: true, force: true });
+}
+
+if (require.main === module) {
+  const args = process.argv.slice(2);
+  if (args[0] === 'search' || args[0] === 'update') {
+    const docsDir = args[0] === 'update' ? (args[1] || 'docs/external') : 'docs/external';
+    const index = DocIndex.open(docsDir);
+    index.update().then(result => {
+      if (args[0] === 'update') {
+        console.log(`📚 Indexed ${result.added} documents (${result.unchanged} unchanged, ${result.removed} removed)`);
+        return;
+      }
+      for (const hit of index.search(args.slice(1).join(' '), { k: 5 })) {
+        console.log(`${hit.score.toFixed(2)}  ${hit.path}:${hit.startLine}-${hit.endLine}\n      ${hit.summary}`);
+      }
+    });
+  } else {
+    console.log('📚 Documentation index benchmark (whole-document loading vs streamed chunk index)\n');
+    runBenchmark().catch(error => {
+      console.error('❌ Benchmark failed:', error);
+      process.exit(1);
+    });
+  }
+}
+
+module.exports = { DocIndex, chunkDocument, summarizeChunk, tokenize };
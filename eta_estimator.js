@@ -0,0 +1,341 @@
+const fs = require('fs');
+const path = require('path');
+
+// Streaming step-duration model for the Progress Transparency System's ETAs.
+//
+// Durations are tracked per step type × technology stack × prototype size
+// bucket. Each key keeps exponentially decayed statistics with a half-life
+// measured in observations:
+//   - a histogram over log-spaced duration buckets, for per-step p50/p90
+//   - decayed weight, mean and mean-of-squares, for summing remaining steps
+// Decay is applied lazily through a per-key scale factor, so recording a
+// completed step touches one bucket and three moments: O(1), with no re-read
+// of history. Sparse keys back off to step × stack, then step alone. A run's
+// remaining time is the sum of its remaining steps, turned into p50/p90 by
+// matching a log-normal to the summed mean and variance.
+//
+// The model persists as `eta_model.json` next to the learning JSON files.
+
+const MODEL_VERSION = 1;
+const MIN_MS = 100;
+const BUCKETS_PER_DOUBLING = 4;
+const BUCKET_COUNT = 96; // 100ms .. ~1.6 years
+const Z90 = 1.2815515655446004;
+
+const DEFAULT_OPTIONS = {
+  halfLife: 50,
+  minWeight: 5,
+  sizeBuckets: [1, 3, 6, 10]
+};
+
+function bucketOf(ms) {
+  const index = Math.floor(Math.log2(Math.max(ms, MIN_MS) / MIN_MS) * BUCKETS_PER_DOUBLING);
+  return Math.min(BUCKET_COUNT - 1, index);
+}
+
+// Geometric midpoint of a bucket
+function bucketValue(index) {
+  return MIN_MS * 2 ** ((index + 0.5) / BUCKETS_PER_DOUBLING);
+}
+
+class DecayedStats {
+  constructor(decay) {
+    this.decay = decay;
+    // Entries are stored pre-multiplied by `scale`; real weight = stored / scale
+    this.scale = 1;
+    this.weight = 0;
+    this.sum = 0;
+    this.sumSquares = 0;
+    this.buckets = new Map();
+  }
+
+  add(ms) {
+    this.scale /= this.decay;
+    if (this.scale > 1e100) this._rescale();
+    this.weight += this.scale;
+    this.sum += ms * this.scale;
+    this.sumSquares += ms * ms * this.scale;
+    const bucket = bucketOf(ms);
+    this.buckets.set(bucket, (this.buckets.get(bucket) || 0) + this.scale);
+  }
+
+  _rescale() {
+    const factor = 1 / this.scale;
+    this.weight *= factor;
+    this.sum *= factor;
+    this.sumSquares *= factor;
+    for (const [bucket, value] of this.buckets) {
+      const scaled = value * factor;
+      if (scaled < 1e-9) {
+        this.buckets.delete(bucket);
+      } else {
+        this.buckets.set(bucket, scaled);
+      }
+    }
+    this.scale = 1;
+  }
+
+  get effectiveWeight() {
+    return this.weight / this.scale;
+  }
+
+  get mean() {
+    return this.sum / this.weight;
+  }
+
+  get variance() {
+    return Math.max(0, this.sumSquares / this.weight - this.mean ** 2);
+  }
+
+  quantile(q) {
+    const target = q * this.weight;
+    let seen = 0;
+    for (const bucket of [...this.buckets.keys()].sort((a, b) => a - b)) {
+      seen += this.buckets.get(bucket);
+      if (seen >= target) return bucketValue(bucket);
+    }
+    return this.mean;
+  }
+
+  toJSON() {
+    this._rescale();
+    const round = value => Number(value.toPrecision(6));
+    return [round(this.weight), round(this.sum), round(this.sumSquares),
+      [...this.buckets].map(([bucket, value]) => [bucket, round(value)])];
+  }
+
+  static fromJSON(decay, [weight, sum, sumSquares, buckets]) {
+    const stats = new DecayedStats(decay);
+    stats.weight = weight;
+    stats.sum = sum;
+    stats.sumSquares = sumSquares;
+    stats.buckets = new Map(buckets);
+    return stats;
+  }
+}
+
+// Log-normal with the given mean and variance (Fenton-Wilkinson)
+function lognormalQuantiles(mean, variance) {
+  if (mean <= 0) return { p50: 0, p90: 0 };
+  const sigma2 = Math.log(1 + variance / (mean * mean));
+  const mu = Math.log(mean) - sigma2 / 2;
+  return { p50: Math.exp(mu), p90: Math.exp(mu + Z90 * Math.sqrt(sigma2)) };
+}
+
+class EtaEstimator {
+  constructor(options = {}) {
+    this.options = { ...DEFAULT_OPTIONS, ...options };
+    this.decay = 0.5 ** (1 / this.options.halfLife);
+    this.stats = new Map();
+  }
+
+  sizeBucket(prototypeSize) {
+    if (prototypeSize === undefined || prototypeSize === null) return 'any';
+    const edges = this.options.sizeBuckets;
+    const index = edges.findIndex(edge => prototypeSize <= edge);
+    return index === -1 ? `>${edges[edges.length - 1]}` : `≤${edges[index]}`;
+  }
+
+  // Most specific first
+  _keys({ stepType, stack = 'any', prototypeSize }) {
+    return [`${stepType}|${stack}|${this.sizeBucket(prototypeSize)}`, `${stepType}|${stack}|*`, `${stepType}|*|*`];
+  }
+
+  // step: { stepType, stack, prototypeSize, durationMs }
+  record(step) {
+    for (const key of this._keys(step)) {
+      let stats = this.stats.get(key);
+      if (!stats) {
+        stats = new DecayedStats(this.decay);
+        this.stats.set(key, stats);
+      }
+      stats.add(step.durationMs);
+    }
+  }
+
+  _statsFor(step) {
+    const keys = this._keys(step);
+    for (const key of keys) {
+      const stats = this.stats.get(key);
+      if (stats && stats.effectiveWeight >= this.options.minWeight) return stats;
+    }
+    // Anything beats nothing
+    for (const key of keys) if (this.stats.has(key)) return this.stats.get(key);
+    return null;
+  }
+
+  // ETA for a single step: { p50, p90 } in ms, or null with no history
+  estimateStep(step) {
+    const stats = this._statsFor(step);
+    if (!stats) return null;
+    return { p50: stats.quantile(0.5), p90: stats.quantile(0.9) };
+  }
+
+  // ETA for the rest of a run; steps[0] is the step in progress and
+  // `elapsedMs` the time already spent in it
+  estimateRemaining(steps, { elapsedMs = 0 } = {}) {
+    let mean = 0;
+    let variance = 0;
+    let unknown = 0;
+    steps.forEach((step, i) => {
+      const stats = this._statsFor(step);
+      if (!stats) {
+        unknown++;
+        return;
+      }
+      mean += i === 0 ? Math.max(stats.mean - elapsedMs, stats.mean * 0.1) : stats.mean;
+      variance += stats.variance;
+    });
+    return { ...lognormalQuantiles(mean, variance), unknownSteps: unknown };
+  }
+
+  // ------------------------------------------------------------ persistence
+
+  toJSON() {
+    return {
+      version: MODEL_VERSION,
+      options: this.options,
+      stats: Object.fromEntries([...this.stats].map(([key, stats]) => [key, stats.toJSON()]))
+    };
+  }
+
+  save(filePath) {
+    fs.writeFileSync(`${filePath}.tmp`, JSON.stringify(this.toJSON()));
+    fs.renameSync(`${filePath}.tmp`, filePath);
+  }
+
+  static load(filePath, options = {}) {
+    if (!fs.existsSync(filePath)) return new EtaEstimator(options);
+    const model = JSON.parse(fs.readFileSync(filePath, 'utf8'));
+    if (model.version !== MODEL_VERSION) return new EtaEstimator(options);
+    const estimator = new EtaEstimator({ ...model.options, ...options });
+    for (const [key, value] of Object.entries(model.stats)) {
+      estimator.stats.set(key, DecayedStats.fromJSON(estimator.decay, value));
+    }
+    return estimator;
+  }
+}
+
+// ------------------------------------------------------------------- backtest
+
+// The current estimator: average duration per step type over all history
+class NaiveAverage {
+  constructor() {
+    this.history = [];
+  }
+
+  record(step) {
+    this.history.push(step);
+  }
+
+  estimateRemaining(steps, { elapsedMs = 0 } = {}) {
+    let total = 0;
+    steps.forEach((step, i) => {
+      const same = this.history.filter(past => past.stepType === step.stepType);
+      const average = same.length ? same.reduce((sum, past) => sum + past.durationMs, 0) / same.length : 0;
+      total += i === 0 ? Math.max(average - elapsedMs, 0) : average;
+    });
+    return { p50: total, p90: total };
+  }
+}
+
+// Replays runs in order. Before each step, every estimator predicts the
+// rest of the run; the step is then recorded. runs: [{ id, steps: [...] }]
+function backtest(runs, estimators) {
+  const results = Object.fromEntries(Object.keys(estimators).map(name =>
+    [name, { absPctError: 0, within90: 0, predictions: 0, estimateNs: 0, updateNs: 0, updates: 0 }]));
+  for (const run of runs) {
+    run.steps.forEach((_, i) => {
+      const remaining = run.steps.slice(i);
+      const actual = remaining.reduce((sum, step) => sum + step.durationMs, 0);
+      for (const [name, estimator] of Object.entries(estimators)) {
+        const start = process.hrtime.bigint();
+        const { p50, p90 } = estimator.estimateRemaining(remaining);
+        const result = results[name];
+        result.estimateNs += Number(process.hrtime.bigint() - start);
+        result.absPctError += Math.abs(p50 - actual) / actual;
+        if (actual <= p90) result.within90++;
+        result.predictions++;
+      }
+    });
+    for (const step of run.steps) {
+      for (const [name, estimator] of Object.entries(estimators)) {
+        const start = process.hrtime.bigint();
+        estimator.record(step);
+        results[name].updateNs += Number(process.hrtime.bigint() - start);
+        results[name].updates++;
+      }
+    }
+  }
+  return Object.entries(results).map(([name, r]) => ({
+    estimator: name,
+    'p50 MAPE': `${((r.absPctError / r.predictions) * 100).toFixed(1)}%`,
+    'actual ≤ p90': `${((r.within90 / r.predictions) * 100).toFixed(1)}%`,
+    'update µs': (r.updateNs / r.updates / 1e3).toFixed(2),
+    'estimate µs': (r.estimateNs / r.predictions / 1e3).toFixed(1)
+  }));
+}
+
+// Reads recorded runs from JSON lines of
+// { runId, stepType, stack, prototypeSize, durationMs }
+function loadRecordedRuns(filePath) {
+  const runs = new Map();
+  for (const line of fs.readFileSync(filePath, 'utf8').split('\n')) {
+    if (!line.trim()) continue;
+    const step = JSON.parse(line);
+    if (!runs.has(step.runId)) runs.set(step.runId, { id: step.runId, steps: [] });
+    runs.get(step.runId).steps.push(step);
+  }
+  return [...runs.values()];
+}
+
+const STEP_TYPES = [
+  ['IMPLEMENT 3.1', 60e3], ['IMPLEMENT 3.2', 180e3], ['IMPLEMENT 3.3', 420e3],
+  ['IMPLEMENT 3.4', 240e3], ['IMPLEMENT 3.5', 90e3], ['QA 3', 900e3], ['QA 4', 600e3]
+];
+const STACKS = { react: 1, vue: 0.8, django: 1.4, fastapi: 0.9 };
+
+// Runs whose durations depend on stack and prototype size and drift faster
+// over time (agents and caches improve), with heavy-tailed noise
+function syntheticRuns(count, seed = 11) {
+  let state = seed;
+  const random = () => {
+    state = (Math.imul(state, 1664525) + 1013904223) >>> 0;
+    return (state + 0.5) / 0x100000000;
+  };
+  const gaussian = () => Math.sqrt(-2 * Math.log(random())) * Math.cos(2 * Math.PI * random());
+  const stacks = Object.keys(STACKS);
+  return Array.from({ length: count }, (_, r) => {
+    const stack = stacks[Math.floor(random() * stacks.length)];
+    const prototypeSize = 1 + Math.floor(random() * 12);
+    const drift = 1.5 - r / count;
+    const features = 2 + Math.floor(prototypeSize / 2);
+    const steps = [];
+    for (let f = 0; f < features; f++) {
+      for (const [stepType, base] of STEP_TYPES.slice(0, 5)) {
+        const durationMs = base * STACKS[stack] * (0.6 + prototypeSize / 10) * drift * Math.exp(0.35 * gaussian());
+        steps.push({ runId: `run-${r}`, stepType, stack, prototypeSize, durationMs });
+      }
+    }
+    for (const [stepType, base] of STEP_TYPES.slice(5)) {
+      steps.push({ runId: `run-${r}`, stepType, stack, prototypeSize,
+        durationMs: base * STACKS[stack] * drift * Math.exp(0.5 * gaussian()) });
+    }
+    return { id: `run-${r}`, steps };
+  });
+}
+
+if (require.main === module) {
+  const args = process.argv.slice(2);
+  let runs;
+  if (args[0] === 'backtest' && args[1]) {
+    console.log(`⏱️  ETA backtest on recorded runs from ${path.resolve(args[1])}\n`);
+    runs = loadRecordedRuns(args[1]);
+  } else {
+    console.log('⏱️  ETA backtest on 400 synthetic IMPLEMENT/QA runs (pass "backtest <runs.jsonl>" for recorded runs)\n');
+    runs = syntheticRuns(400);
+  }
+  console.table(backtest(runs, { 'naive average': new NaiveAverage(), 'decayed model': new EtaEstimator() }));
+}
+
+module.exports = { EtaEstimator, DecayedStats, NaiveAverage, backtest, loadRecordedRuns };
@@ -0,0 +1,485 @@
+// Batched, coalesced progress event pipeline for the Kanban board.
+//
+// Publishers push partial task updates as often as they like. The bus keeps
+// only the latest state per task and, once per window, sends each subscriber
+// a single binary frame holding just the fields that changed since that
+// subscriber's previous frame. A subscriber whose socket buffer is above its
+// high-water mark is skipped for that window: the intermediate states it
+// missed are superseded by later ones, but because the bus keeps the latest
+// state per task (and a final state is always the latest), a completed,
+// failed or cancelled task is always delivered once the socket drains.
+//
+// Frame layout (little endian):
+//   u8 version | u8 flags | u32 seq | u16 newStrings | { u16 id, u16 len, utf8 }*
+//   | u32 tasks | { u16 taskRef, u8 mask, [u16 progress‱], [u8 status],
+//                  [u32 etaMs], [u16 stepRef] }*
+// Strings (task ids, step names) are interned per subscriber and sent once;
+// flag RESET_STRINGS tells the client to drop its table before reading.
+//
+// The decoder half has no Node dependencies so the React client can import
+// it; BatchedFrameApplier applies every frame received within one animation
+// frame as a single render.
+
+const FRAME_VERSION = 1;
+const RESET_STRINGS = 1;
+const MAX_STRINGS = 0xffff;
+const STATUSES = ['pending', 'in_progress', 'completed', 'failed', 'cancelled', 'blocked'];
+const FINAL_STATUSES = new Set(['completed', 'failed', 'cancelled']);
+const FIELDS = [
+  { name: 'progress', bit: 1 },
+  { name: 'status', bit: 2 },
+  { name: 'etaMs', bit: 4 },
+  { name: 'step', bit: 8 }
+];
+
+const DEFAULT_OPTIONS = {
+  windowMs: 100,
+  highWaterMark: 256 * 1024
+};
+
+const encoder = new TextEncoder();
+const decoder = new TextDecoder();
+
+// ------------------------------------------------------------------ encoding
+
+class FrameWriter {
+  constructor() {
+    this.buffer = new ArrayBuffer(1024);
+    this.view = new DataView(this.buffer);
+    this.offset = 0;
+  }
+
+  _reserve(bytes) {
+    if (this.offset + bytes <= this.buffer.byteLength) return;
+    let size = this.buffer.byteLength * 2;
+    while (size < this.offset + bytes) size *= 2;
+    const grown = new ArrayBuffer(size);
+    new Uint8Array(grown).set(new Uint8Array(this.buffer, 0, this.offset));
+    this.buffer = grown;
+    this.view = new DataView(grown);
+  }
+
+  u8(value) { this._reserve(1); this.view.setUint8(this.offset, value); this.offset += 1; }
+  u16(value) { this._reserve(2); this.view.setUint16(this.offset, value, true); this.offset += 2; }
+  u32(value) { this._reserve(4); this.view.setUint32(this.offset, value, true); this.offset += 4; }
+
+  bytes(array) {
+    this._reserve(array.length);
+    new Uint8Array(this.buffer, this.offset, array.length).set(array);
+    this.offset += array.length;
+  }
+
+  finish() {
+    return new Uint8Array(this.buffer.slice(0, this.offset));
+  }
+}
+
+function sameValue(field, a, b) {
+  if (field === 'progress') return Math.round(a * 10000) === Math.round(b * 10000);
+  return a === b;
+}
+
+// ----------------------------------------------------------------------- bus
+
+class ProgressEventBus {
+  constructor(options = {}) {
+    this.options = { ...DEFAULT_OPTIONS, ...options };
+    this.tasks = new Map();
+    this.subscribers = new Set();
+    this.timer = null;
+    this.counters = { published: 0, frames: 0, bytes: 0, deferred: 0 };
+  }
+
+  // connection: { send(Uint8Array), bufferedAmount?() } — matches a ws /
+  // Socket.io binary emit wrapper
+  subscribe(connection) {
+    const subscriber = {
+      connection,
+      seq: 0,
+      strings: new Map(),
+      sent: new Map(),
+      // A late joiner gets the current state of every task in its first frame
+      dirty: new Set(this.tasks.keys())
+    };
+    this.subscribers.add(subscriber);
+    this._schedule();
+    return () => this.subscribers.delete(subscriber);
+  }
+
+  // update: { id, progress?, status?, etaMs?, step? }
+  publish(update) {
+    const current = this.tasks.get(update.id) || {};
+    const next = { ...current };
+    for (const { name } of FIELDS) if (update[name] !== undefined) next[name] = update[name];
+    this.tasks.set(update.id, next);
+    this.counters.published++;
+    for (const subscriber of this.subscribers) subscriber.dirty.add(update.id);
+    this._schedule();
+  }
+
+  _schedule() {
+    if (this.timer !== null || this.options.windowMs === null) return;
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.flush();
+    }, this.options.windowMs);
+  }
+
+  // Sends one coalesced frame to every subscriber that can take it. Called
+  // by the window timer, or directly by callers that drive their own clock.
+  flush() {
+    for (const subscriber of this.subscribers) {
+      if (subscriber.dirty.size === 0) continue;
+      const buffered = subscriber.connection.bufferedAmount ? subscriber.connection.bufferedAmount() : 0;
+      if (buffered > this.options.highWaterMark) {
+        this.counters.deferred++;
+        continue;
+      }
+      const frame = this._encodeFor(subscriber);
+      if (!frame) continue;
+      subscriber.connection.send(frame);
+      this.counters.frames++;
+      this.counters.bytes += frame.byteLength;
+    }
+    this._forgetDelivered();
+    // Skipped subscribers still hold dirty tasks; try them next window
+    for (const subscriber of this.subscribers) {
+      if (subscriber.dirty.size > 0) {
+        this._schedule();
+        break;
+      }
+    }
+  }
+
+  _intern(subscriber, value, fresh) {
+    let id = subscriber.strings.get(value);
+    if (id === undefined) {
+      id = subscriber.strings.size;
+      subscriber.strings.set(value, id);
+      fresh.push([id, value]);
+    }
+    return id;
+  }
+
+  _encodeFor(subscriber) {
+    // Every dirty task can intern at most two strings (its id and its step)
+    let flags = 0;
+    if (subscriber.strings.size + subscriber.dirty.size * 2 > MAX_STRINGS) {
+      subscriber.strings.clear();
+      flags |= RESET_STRINGS;
+    }
+    const fresh = [];
+    const entries = [];
+    for (const taskId of subscriber.dirty) {
+      const state = this.tasks.get(taskId);
+      const sent = subscriber.sent.get(taskId) || {};
+      let mask = 0;
+      for (const { name, bit } of FIELDS) {
+        if (state[name] !== undefined && !sameValue(name, state[name], sent[name])) mask |= bit;
+      }
+      if (mask === 0) continue;
+      entries.push({
+        ref: this._intern(subscriber, taskId, fresh),
+        mask,
+        state,
+        stepRef: mask & 8 ? this._intern(subscriber, state.step, fresh) : 0
+      });
+      subscriber.sent.set(taskId, { ...state });
+    }
+    subscriber.dirty.clear();
+    if (entries.length === 0) return null;
+
+    const writer = new FrameWriter();
+    writer.u8(FRAME_VERSION);
+    writer.u8(flags);
+    writer.u32(++subscriber.seq);
+    writer.u16(fresh.length);
+    for (const [id, value] of fresh) {
+      const bytes = encoder.encode(value);
+      writer.u16(id);
+      writer.u16(bytes.length);
+      writer.bytes(bytes);
+    }
+    writer.u32(entries.length);
+    for (const { ref, mask, state, stepRef } of entries) {
+      writer.u16(ref);
+      writer.u8(mask);
+      if (mask & 1) writer.u16(Math.max(0, Math.min(10000, Math.round(state.progress * 10000))));
+      if (mask & 2) writer.u8(Math.max(0, STATUSES.indexOf(state.status)));
+      if (mask & 4) writer.u32(Math.max(0, Math.min(0xffffffff, Math.round(state.etaMs))));
+      if (mask & 8) writer.u16(stepRef);
+    }
+    return writer.finish();
+  }
+
+  // Final tasks delivered to every subscriber no longer need to be tracked
+  _forgetDelivered() {
+    for (const [taskId, state] of this.tasks) {
+      if (!FINAL_STATUSES.has(state.status)) continue;
+      let delivered = true;
+      for (const subscriber of this.subscribers) {
+        if (subscriber.dirty.has(taskId)) {
+          delivered = false;
+          break;
+        }
+      }
+      if (!delivered) continue;
+      this.tasks.delete(taskId);
+      for (const subscriber of this.subscribers) subscriber.sent.delete(taskId);
+    }
+  }
+
+  close() {
+    if (this.timer !== null) clearTimeout(this.timer);
+    this.timer = null;
+  }
+}
+
+// -------------------------------------------------------------- client side
+
+class ProgressFrameDecoder {
+  constructor() {
+    this.strings = new Map();
+    this.tasks = new Map();
+    this.lastSeq = 0;
+  }
+
+  // Applies one frame to the local task map; returns the ids it touched
+  apply(frame) {
+    const bytes = frame instanceof Uint8Array ? frame : new Uint8Array(frame);
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    let offset = 0;
+    const version = view.getUint8(offset); offset += 1;
+    if (version !== FRAME_VERSION) throw new Error(`Unsupported progress frame version ${version}`);
+    const flags = view.getUint8(offset); offset += 1;
+    if (flags & RESET_STRINGS) this.strings.clear();
+    this.lastSeq = view.getUint32(offset, true); offset += 4;
+    const stringCount = view.getUint16(offset, true); offset += 2;
+    for (let i = 0; i < stringCount; i++) {
+      const id = view.getUint16(offset, true); offset += 2;
+      const length = view.getUint16(offset, true); offset += 2;
+      this.strings.set(id, decoder.decode(bytes.subarray(offset, offset + length)));
+      offset += length;
+    }
+    const taskCount = view.getUint32(offset, true); offset += 4;
+    const touched = [];
+    for (let i = 0; i < taskCount; i++) {
+      const taskId = this.strings.get(view.getUint16(offset, true)); offset += 2;
+      const mask = view.getUint8(offset); offset += 1;
+      const task = this.tasks.get(taskId) || { id: taskId };
+      if (mask & 1) { task.progress = view.getUint16(offset, true) / 10000; offset += 2; }
+      if (mask & 2) { task.status = STATUSES[view.getUint8(offset)]; offset += 1; }
+      if (mask & 4) { task.etaMs = view.getUint32(offset, true); offset += 4; }
+      if (mask & 8) { task.step = this.strings.get(view.getUint16(offset, true)); offset += 2; }
+      this.tasks.set(taskId, task);
+      touched.push(taskId);
+    }
+    return touched;
+  }
+}
+
+// Queues incoming frames and applies them all in one render per animation
+// frame, e.g. render = changed => setTasks(new Map(decoder.tasks))
+class BatchedFrameApplier {
+  constructor(render, { decoder: frameDecoder = new ProgressFrameDecoder(), schedule } = {}) {
+    this.render = render;
+    this.decoder = frameDecoder;
+    this.schedule = schedule ||
+      (typeof requestAnimationFrame === 'function' ? requestAnimationFrame : callback => setTimeout(callback, 16));
+    this.queue = [];
+    this.pending = false;
+  }
+
+  push(frame) {
+    this.queue.push(frame);
+    if (this.pending) return;
+    this.pending = true;
+    this.schedule(() => this.drain());
+  }
+
+  drain() {
+    this.pending = false;
+    const frames = this.queue;
+    this.queue = [];
+    const changed = new Set();
+    for (const frame of frames) for (const taskId of this.decoder.apply(frame)) changed.add(taskId);
+    if (changed.size > 0) this.render(changed, this.decoder.tasks);
+    return changed.size;
+  }
+}
+
+// ------------------------------------------------------------------ load test
+
+// Socket stand-in: drains `bytesPerTick` from its buffer on every tick
+class SimulatedConnection {
+  constructor(bytesPerTick) {
+    this.bytesPerTick = bytesPerTick;
+    this.buffered = 0;
+    this.received = [];
+  }
+
+  send(payload) {
+    this.buffered += typeof payload === 'string' ? Buffer.byteLength(payload) : payload.byteLength;
+    this.received.push(payload);
+  }
+
+  bufferedAmount() {
+    return this.buffered;
+  }
+
+  tick() {
+    this.buffered = Math.max(0, this.buffered - this.bytesPerTick);
+  }
+}
+
+const TDD_STEPS = ['3.1 Feature Selection', '3.2 RED Phase', '3.3 GREEN Phase', '3.4 REFACTOR Phase',
+  '3.5 BMAD Validation', '3.6 Loop Control'];
+
+// Every task emits a sub-step/ETA update each tick and finishes at a random
+// point; returns the update stream per tick
+function syntheticUpdates({ tasks, ticks, seed = 7 }) {
+  let state = seed;
+  const random = () => {
+    state = (Math.imul(state, 1664525) + 1013904223) >>> 0;
+    return state / 0x100000000;
+  };
+  const finishAt = Array.from({ length: tasks }, () => Math.floor(ticks * (0.5 + random() / 2)));
+  return Array.from({ length: ticks }, (_, tick) => {
+    const updates = [];
+    for (let t = 0; t < tasks; t++) {
+      if (tick > finishAt[t]) continue;
+      const done = tick === finishAt[t];
+      // Several sub-step and ETA events per task per tick, as in the TDD loop
+      for (let burst = 0; burst < 3; burst++) {
+        updates.push({
+          id: `task-${t}`,
+          progress: done ? 1 : Math.min(0.99, (tick + burst / 3) / finishAt[t]),
+          status: done ? (random() < 0.9 ? 'completed' : 'failed') : 'in_progress',
+          etaMs: done ? 0 : Math.round((finishAt[t] - tick) * 100 + random() * 500),
+          step: TDD_STEPS[(tick + burst) % TDD_STEPS.length]
+        });
+        if (done) break;
+      }
+    }
+    return updates;
+  });
+}
+
+// The object the current system emits for every update
+function fullTaskObject(update) {
+  return {
+    ...update,
+    title: `Implement feature for ${update.id}`,
+    description: 'TDD feature loop task generated from the prototype definition',
+    prototype: 'prototype-1',
+    command: 'IMPLEMENT',
+    column: update.status === 'in_progress' ? 'In Progress' : 'Done',
+    updatedAt: new Date(0).toISOString()
+  };
+}
+
+function hrMs(start) {
+  return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+function runLoadTest({ tasks = 500, subscribers = 100, ticks = 50, tickMs = 100, slowShare = 0.1 } = {}) {
+  const stream = syntheticUpdates({ tasks, ticks });
+  const published = stream.reduce((sum, updates) => sum + updates.length, 0);
+  const seconds = (ticks * tickMs) / 1000;
+  const makeConnections = () => Array.from({ length: subscribers }, (_, i) =>
+    new SimulatedConnection(i < subscribers * slowShare ? 1024 : Infinity));
+
+  // Before: one JSON emit of the full task object per update per subscriber
+  const before = makeConnections();
+  let start = process.hrtime.bigint();
+  let beforeBytes = 0;
+  let beforeMessages = 0;
+  for (const updates of stream) {
+    for (const update of updates) {
+      const message = JSON.stringify({ event: 'task:progress', data: fullTaskObject(update) });
+      for (const connection of before) connection.send(message);
+      beforeBytes += Buffer.byteLength(message) * before.length;
+      beforeMessages += before.length;
+    }
+    for (const connection of before) connection.tick();
+  }
+  const beforeServerMs = hrMs(start);
+  const beforeClient = new Map();
+  start = process.hrtime.bigint();
+  let beforeRenders = 0;
+  for (const message of before[before.length - 1].received) {
+    const { data } = JSON.parse(message);
+    beforeClient.set(data.id, data);
+    beforeRenders++; // one state update / render per event
+  }
+  const beforeClientMs = hrMs(start);
+
+  // After: coalescing bus with a frame per window per subscriber
+  const bus = new ProgressEventBus({ windowMs: null, highWaterMark: 8 * 1024 });
+  const after = makeConnections();
+  for (const connection of after) bus.subscribe(connection);
+  start = process.hrtime.bigint();
+  for (const updates of stream) {
+    for (const update of updates) bus.publish(update);
+    bus.flush();
+    for (const connection of after) connection.tick();
+  }
+  // Let slow clients drain so their final states go out
+  for (let drain = 0; drain < 1000 && bus.subscribers.size && [...bus.subscribers].some(s => s.dirty.size); drain++) {
+    for (const connection of after) connection.tick();
+    bus.flush();
+  }
+  const afterServerMs = hrMs(start);
+
+  const frames = after[after.length - 1].received;
+  let renders = 0;
+  const applier = new BatchedFrameApplier(() => { renders++; }, { schedule: () => {} });
+  start = process.hrtime.bigint();
+  for (const frame of frames) {
+    applier.push(frame);
+    applier.drain(); // one animation frame per window
+  }
+  const afterClientMs = hrMs(start);
+
+  // Every task's final state must reach every subscriber, slow ones included
+  const slowDecoder = new ProgressFrameDecoder();
+  for (const frame of after[0].received) slowDecoder.apply(frame);
+  const finals = [...slowDecoder.tasks.values()].filter(task => FINAL_STATUSES.has(task.status)).length;
+
+  console.table([
+    {
+      pipeline: 'emit per update (JSON)',
+      'events/sec': Math.round(beforeMessages / seconds),
+      'MB on wire': (beforeBytes / 1e6).toFixed(1),
+      'server ms': beforeServerMs.toFixed(0),
+      'client renders': beforeRenders,
+      'client ms/sec': (beforeClientMs / seconds).toFixed(2)
+    },
+    {
+      pipeline: 'coalesced binary frames',
+      'events/sec': Math.round(bus.counters.frames / seconds),
+      'MB on wire': (bus.counters.bytes / 1e6).toFixed(1),
+      'server ms': afterServerMs.toFixed(0),
+      'client renders': renders,
+      'client ms/sec': (afterClientMs / seconds).toFixed(2)
+    }
+  ]);
+  console.log(`\n📨 ${published} updates published over ${seconds}s simulated; ` +
+    `${bus.counters.deferred} frames deferred for slow clients`);
+  console.log(`✅ Slow client received final state for ${finals}/${tasks} tasks`);
+}
+
+if (typeof module !== 'undefined' && typeof require !== 'undefined' && require.main === module) {
+  console.log('📡 Progress event pipeline load test (500 tasks, 100 subscribers)\n');
+  runLoadTest();
+}
+
+if (typeof module !== 'undefined') {
+  module.exports = {
+    ProgressEventBus,
+    ProgressFrameDecoder,
+    BatchedFrameApplier,
+    STATUSES,
+    FINAL_STATUSES
+  };
+}
@@ -0,0 +1,454 @@
+const fs = require('fs');
+const path = require('path');
+
+// Vectorized similarity engine for cross-project pattern matching.
+//
+// Every stored project/pattern is flattened into feature tokens and folded
+// into a fixed-width signed vector with the hashing trick. Vectors live in one
+// contiguous Int8Array, so a top-k query is a single pass of dot products over
+// the matrix rather than a walk over pattern objects. With unit feature
+// weights the dot product estimates the size of the token intersection, which
+// together with the stored token counts gives the same Jaccard score the
+// pattern walker ranks by. Large corpora can add an IVF index (spherical
+// k-means lists) and probe only the closest lists.
+
+const MATRIX_FILE = 'similarity_matrix.i8';
+const META_FILE = 'similarity_meta.json';
+
+const DEFAULT_OPTIONS = {
+  dims: 256,
+  ivfThreshold: 50000,
+  nprobe: 8,
+  trainingSample: 20000,
+  kmeansIterations: 8
+};
+
+// ------------------------------------------------------------------ features
+
+// Flattens an object into `path=value` tokens; free-text fields also yield
+// one token per word so descriptions contribute to similarity
+function featurize(item, prefix = '', tokens = new Set()) {
+  if (item === null || item === undefined) return tokens;
+  if (Array.isArray(item)) {
+    for (const value of item) featurize(value, prefix, tokens);
+    return tokens;
+  }
+  if (typeof item === 'object') {
+    for (const [key, value] of Object.entries(item)) {
+      if (key === 'id') continue;
+      featurize(value, prefix ? `${prefix}.${key}` : key, tokens);
+    }
+    return tokens;
+  }
+  if (typeof item === 'number') {
+    // Bucket numbers so 0.81 and 0.84 success rates share a feature
+    tokens.add(`${prefix}=${Math.round(item * 10) / 10}`);
+    return tokens;
+  }
+  const text = String(item).toLowerCase();
+  if (text.includes(' ')) {
+    for (const word of text.split(/[^a-z0-9+#.-]+/)) {
+      if (word.length > 2) tokens.add(`${prefix}~${word}`);
+    }
+  } else {
+    tokens.add(`${prefix}=${text}`);
+  }
+  return tokens;
+}
+
+// 32-bit FNV-1a; the low bits pick the dimension, the top bit the sign
+function hashToken(token) {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < token.length; i++) {
+    hash ^= token.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+}
+
+function jaccard(a, b) {
+  let intersection = 0;
+  for (const token of a) if (b.has(token)) intersection++;
+  return intersection / (a.size + b.size - intersection || 1);
+}
+
+// The current matcher: compare the query with every stored pattern
+function walkMatch(corpus, item, k = 10) {
+  const query = featurize(item);
+  return corpus
+    .map(entry => ({ id: entry.id, score: jaccard(query, entry.tokens) }))
+    .sort((a, b) => b.score - a.score)
+    .slice(0, k);
+}
+
+// Keeps the k best (score, row) pairs in a small sorted array; k is tiny
+// compared with the corpus, so insertion beats a heap here
+class TopK {
+  constructor(k) {
+    this.k = k;
+    this.scores = [];
+    this.rows = [];
+  }
+
+  push(score, row) {
+    const { scores, rows } = this;
+    if (scores.length === this.k && score <= scores[scores.length - 1]) return;
+    let i = scores.length;
+    while (i > 0 && scores[i - 1] < score) i--;
+    scores.splice(i, 0, score);
+    rows.splice(i, 0, row);
+    if (scores.length > this.k) {
+      scores.pop();
+      rows.pop();
+    }
+  }
+}
+
+// -------------------------------------------------------------------- engine
+
+class SimilarityEngine {
+  constructor(options = {}) {
+    this.options = { ...DEFAULT_OPTIONS, ...options };
+    this.dims = this.options.dims;
+    this.ids = [];
+    this.counts = [];
+    this.matrix = new Int8Array(this.dims * 1024);
+    this.ivf = null;
+  }
+
+  get size() {
+    return this.ids.length;
+  }
+
+  vectorize(item, target = new Int8Array(this.dims), offset = 0) {
+    const tokens = featurize(item);
+    for (const token of tokens) {
+      const hash = hashToken(token);
+      const slot = offset + (hash % this.dims);
+      const next = target[slot] + (hash & 0x80000000 ? -1 : 1);
+      target[slot] = Math.max(-127, Math.min(127, next));
+    }
+    return { vector: target, count: tokens.size };
+  }
+
+  add(id, item) {
+    const row = this.ids.length;
+    if ((row + 1) * this.dims > this.matrix.length) {
+      const grown = new Int8Array(this.matrix.length * 2);
+      grown.set(this.matrix);
+      this.matrix = grown;
+    }
+    const { count } = this.vectorize(item, this.matrix, row * this.dims);
+    this.ids.push(id);
+    this.counts.push(count);
+    if (this.ivf) this._assignToList(row);
+    return row;
+  }
+
+  addMany(entries) {
+    for (const [id, item] of entries) this.add(id, item);
+  }
+
+  // Trains the IVF index once the corpus is large enough to benefit
+  build() {
+    if (this.size >= this.options.ivfThreshold) this._trainIvf();
+    return this;
+  }
+
+  // ---------------------------------------------------------------- scoring
+
+  // Scores a block of queries against a set of rows in one pass over the
+  // matrix; queries share each row load, which is where batching pays off.
+  // Query vectors hold only a few dozen non-zero slots, so each row is read
+  // at those slots instead of across all dims.
+  _scoreRows(queries, rowsIter, heaps) {
+    const dims = this.dims;
+    const matrix = this.matrix;
+    for (const row of rowsIter) {
+      const base = row * dims;
+      const count = this.counts[row];
+      for (let q = 0; q < queries.length; q++) {
+        const { slots, weights } = queries[q];
+        let dot = 0;
+        for (let i = 0; i < slots.length; i++) dot += matrix[base + slots[i]] * weights[i];
+        // dot estimates |A ∩ B|; turn it into the walker's Jaccard score
+        const intersection = Math.max(0, dot);
+        const score = intersection / (queries[q].count + count - intersection || 1);
+        heaps[q].push(score, row);
+      }
+    }
+  }
+
+  _sparseQuery(item) {
+    const { vector, count } = this.vectorize(item);
+    const slots = [];
+    const weights = [];
+    vector.forEach((weight, slot) => {
+      if (weight !== 0) {
+        slots.push(slot);
+        weights.push(weight);
+      }
+    });
+    return { vector, count, slots: Int32Array.from(slots), weights: Int32Array.from(weights) };
+  }
+
+  queryBatch(items, { k = 10, exact = false, nprobe = this.options.nprobe } = {}) {
+    const queries = items.map(item => this._sparseQuery(item));
+    const heaps = queries.map(() => new TopK(k));
+    if (this.ivf && !exact) {
+      // Each query probes its own lists, so score per query
+      queries.forEach((query, q) => {
+        for (const list of this._nearestLists(query, nprobe)) {
+          this._scoreRows([query], this.ivf.lists[list], [heaps[q]]);
+        }
+      });
+    } else {
+      this._scoreRows(queries, rowRange(this.size), heaps);
+    }
+    return heaps.map(heap => heap.rows.map((row, i) => ({ id: this.ids[row], score: heap.scores[i] })));
+  }
+
+  query(item, options) {
+    return this.queryBatch([item], options)[0];
+  }
+
+  // -------------------------------------------------------------------- IVF
+
+  // Non-zero slots of a stored row scaled to unit length; rows are as sparse
+  // as queries, so k-means works on these instead of full dims
+  _unitRow(row) {
+    const base = row * this.dims;
+    const slots = [];
+    const weights = [];
+    let norm = 0;
+    for (let d = 0; d < this.dims; d++) {
+      const value = this.matrix[base + d];
+      if (value === 0) continue;
+      slots.push(d);
+      weights.push(value);
+      norm += value * value;
+    }
+    norm = Math.sqrt(norm) || 1;
+    return { slots, weights: weights.map(weight => weight / norm) };
+  }
+
+  _trainIvf() {
+    const dims = this.dims;
+    const nlist = Math.max(1, Math.round(Math.sqrt(this.size)));
+    const sampleSize = Math.min(this.size, Math.max(this.options.trainingSample, nlist * 4));
+    const stride = this.size / sampleSize;
+    const sample = Array.from({ length: sampleSize }, (_, i) => this._unitRow(Math.floor(i * stride)));
+
+    // Spherical k-means on the sample, seeded from evenly spaced rows
+    const centroids = new Float32Array(nlist * dims);
+    for (let c = 0; c < nlist; c++) {
+      const { slots, weights } = sample[Math.floor((c * sampleSize) / nlist)];
+      slots.forEach((slot, i) => { centroids[c * dims + slot] = weights[i]; });
+    }
+    const assignment = new Int32Array(sampleSize);
+    for (let iteration = 0; iteration < this.options.kmeansIterations; iteration++) {
+      sample.forEach((unit, i) => { assignment[i] = this._closestCentroid(centroids, nlist, unit); });
+      const sums = new Float32Array(nlist * dims);
+      sample.forEach(({ slots, weights }, i) => {
+        const base = assignment[i] * dims;
+        slots.forEach((slot, j) => { sums[base + slot] += weights[j]; });
+      });
+      for (let c = 0; c < nlist; c++) {
+        let norm = 0;
+        for (let d = 0; d < dims; d++) norm += sums[c * dims + d] ** 2;
+        if (norm === 0) continue; // empty list keeps its previous centroid
+        norm = Math.sqrt(norm);
+        for (let d = 0; d < dims; d++) centroids[c * dims + d] = sums[c * dims + d] / norm;
+      }
+    }
+
+    this.ivf = { nlist, centroids, lists: Array.from({ length: nlist }, () => []) };
+    for (let row = 0; row < this.size; row++) this._assignToList(row);
+  }
+
+  _closestCentroid(centroids, nlist, { slots, weights }) {
+    let best = 0;
+    let bestScore = -Infinity;
+    for (let c = 0; c < nlist; c++) {
+      const base = c * this.dims;
+      let dot = 0;
+      for (let i = 0; i < slots.length; i++) dot += centroids[base + slots[i]] * weights[i];
+      if (dot > bestScore) {
+        bestScore = dot;
+        best = c;
+      }
+    }
+    return best;
+  }
+
+  _assignToList(row) {
+    this.ivf.lists[this._closestCentroid(this.ivf.centroids, this.ivf.nlist, this._unitRow(row))].push(row);
+  }
+
+  _nearestLists({ slots, weights }, nprobe) {
+    const heap = new TopK(Math.min(nprobe, this.ivf.nlist));
+    for (let c = 0; c < this.ivf.nlist; c++) {
+      const base = c * this.dims;
+      let dot = 0;
+      for (let i = 0; i < slots.length; i++) dot += this.ivf.centroids[base + slots[i]] * weights[i];
+      heap.push(dot, c);
+    }
+    return heap.rows;
+  }
+
+  // ------------------------------------------------------------ persistence
+
+  save(dir) {
+    fs.mkdirSync(dir, { recursive: true });
+    const used = this.matrix.subarray(0, this.size * this.dims);
+    fs.writeFileSync(path.join(dir, MATRIX_FILE), Buffer.from(used.buffer, used.byteOffset, used.byteLength));
+    const meta = {
+      options: this.options,
+      ids: this.ids,
+      counts: this.counts,
+      ivf: this.ivf && {
+        nlist: this.ivf.nlist,
+        centroids: Buffer.from(this.ivf.centroids.buffer).toString('base64'),
+        lists: this.ivf.lists
+      }
+    };
+    fs.writeFileSync(path.join(dir, META_FILE), JSON.stringify(meta));
+  }
+
+  // Node has no mmap, so the matrix file is read with a single read into one
+  // buffer and viewed in place; rows are never copied or parsed one by one.
+  static load(dir) {
+    const meta = JSON.parse(fs.readFileSync(path.join(dir, META_FILE), 'utf8'));
+    const engine = new SimilarityEngine(meta.options);
+    const file = path.join(dir, MATRIX_FILE);
+    const bytes = fs.statSync(file).size;
+    const buffer = new ArrayBuffer(Math.max(bytes, engine.dims));
+    const fd = fs.openSync(file, 'r');
+    fs.readSync(fd, new Uint8Array(buffer), 0, bytes, 0);
+    fs.closeSync(fd);
+    engine.matrix = new Int8Array(buffer);
+    engine.ids = meta.ids;
+    engine.counts = meta.counts;
+    if (meta.ivf) {
+      const raw = Buffer.from(meta.ivf.centroids, 'base64');
+      engine.ivf = {
+        nlist: meta.ivf.nlist,
+        centroids: new Float32Array(raw.buffer.slice(raw.byteOffset, raw.byteOffset + raw.byteLength)),
+        lists: meta.ivf.lists
+      };
+    }
+    return engine;
+  }
+}
+
+function* rowRange(count) {
+  for (let row = 0; row < count; row++) yield row;
+}
+
+// ------------------------------------------------------------------ benchmark
+
+const STACKS = ['react', 'vue', 'angular', 'express', 'django', 'fastapi', 'rails', 'nextjs', 'svelte', 'flask'];
+const DATABASES = ['sqlite', 'postgres', 'mysql', 'mongodb', 'redis', 'none'];
+const TYPES = ['planning', 'implementation', 'refactoring', 'optimization', 'testing', 'security'];
+const WORDS = ['auth', 'kanban', 'realtime', 'todo', 'dashboard', 'payments', 'upload', 'search',
+  'chat', 'reporting', 'api', 'cache', 'queue', 'sync', 'export', 'import', 'offline', 'mobile'];
+
+// Projects are drawn around a few hundred archetypes so neighbours exist
+function syntheticProject(i) {
+  let seed = i * 2654435761 >>> 0;
+  const random = () => {
+    seed = (Math.imul(seed, 1664525) + 1013904223) >>> 0;
+    return seed / 0x100000000;
+  };
+  const archetype = Math.floor(random() * 300);
+  const pick = (list, salt) => list[(archetype * 31 + salt + (random() < 0.2 ? Math.floor(random() * 7) : 0)) % list.length];
+  return {
+    id: `project-${i}`,
+    technology_stack: { frontend: pick(STACKS, 1), backend: pick(STACKS, 5), database: pick(DATABASES, 3) },
+    methodology: ['bmad', 'sage', 'archon'][archetype % 3],
+    pattern_type: pick(TYPES, 2),
+    prototype_count: 2 + (archetype % 4),
+    success_rate: Math.round((0.5 + random() / 2) * 100) / 100,
+    description: Array.from({ length: 6 }, (_, w) => pick(WORDS, w * 5)).join(' ')
+  };
+}
+
+function percentile(sorted, p) {
+  return sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+}
+
+function latency(fn, runs) {
+  const samples = [];
+  for (let i = 0; i < runs; i++) {
+    const start = process.hrtime.bigint();
+    fn(i);
+    samples.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  samples.sort((a, b) => a - b);
+  return { p50: percentile(samples, 0.5).toFixed(2), p99: percentile(samples, 0.99).toFixed(2) };
+}
+
+// Ties are common with Jaccard scores, so a hit counts when its true score
+// reaches the golden k-th score rather than only when its id matches
+function recallAt(results, golden, query, tokensById) {
+  const threshold = golden[golden.length - 1].score - 1e-9;
+  const hits = results.filter(hit => jaccard(query, tokensById.get(hit.id)) >= threshold).length;
+  return Math.min(1, hits / golden.length);
+}
+
+function runBenchmark(sizes, { k = 10, queries = 50 } = {}) {
+  const rows = [];
+  for (const size of sizes) {
+    // The golden 10k run builds the IVF index too so its recall is measured
+    const engine = new SimilarityEngine(size <= 10000 ? { ivfThreshold: 0 } : {});
+    const buildStart = Date.now();
+    for (let i = 0; i < size; i++) engine.add(`project-${i}`, syntheticProject(i));
+    engine.build();
+    const buildMs = Date.now() - buildStart;
+    const probes = Array.from({ length: queries }, (_, q) => syntheticProject(size + q));
+
+    const exact = latency(q => engine.query(probes[q], { k, exact: true }), queries);
+    const approximate = engine.ivf ? latency(q => engine.query(probes[q], { k }), queries) : null;
+    const batch = Date.now();
+    engine.queryBatch(probes, { k, exact: true });
+    const batchMs = (Date.now() - batch) / queries;
+
+    // Golden set: the current pattern walker, only affordable at 10k
+    let walker = null;
+    let exactRecall = null;
+    let ivfRecall = null;
+    if (size <= 10000) {
+      const corpus = Array.from({ length: size }, (_, i) => ({ id: `project-${i}`, tokens: featurize(syntheticProject(i)) }));
+      const tokensById = new Map(corpus.map(entry => [entry.id, entry.tokens]));
+      const golden = probes.map(probe => walkMatch(corpus, probe, k));
+      walker = latency(q => walkMatch(corpus, probes[q], k), Math.min(queries, 20));
+      const mean = values => (values.reduce((a, b) => a + b, 0) / values.length).toFixed(3);
+      const recall = options => mean(probes.map((probe, q) =>
+        recallAt(engine.query(probe, { k, ...options }), golden[q], featurize(probe), tokensById)));
+      exactRecall = recall({ exact: true });
+      ivfRecall = recall({});
+    }
+
+    rows.push({
+      patterns: size,
+      'build ms': buildMs,
+      'walker p50/p99 ms': walker ? `${walker.p50} / ${walker.p99}` : '-',
+      'exact p50/p99 ms': `${exact.p50} / ${exact.p99}`,
+      'ivf p50/p99 ms': approximate ? `${approximate.p50} / ${approximate.p99}` : '-',
+      'batched ms/query': batchMs.toFixed(2),
+      [`exact recall@${k}`]: exactRecall ?? '-',
+      [`ivf recall@${k}`]: ivfRecall ?? '-'
+    });
+  }
+  console.table(rows);
+}
+
+if (require.main === module) {
+  const full = process.argv.includes('--full');
+  console.log('🔎 Similarity engine benchmark (pattern walker vs vector matrix)\n');
+  // The IVF index kicks in at 50k rows; the 10k golden run builds it as well
+  runBenchmark(full ? [1e4, 1e5, 1e6] : [1e4, 1e5]);
+  if (!full) console.log('\n💡 Run with --full to include the 1M pattern case');
+}
+
+module.exports = { SimilarityEngine, featurize, hashToken, walkMatch };
@@ -0,0 +1,361 @@
+const { setMaxListeners } = require('events');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+// Dependency-driven scheduler for the command steps in
+// integrated_context_system.md.
+//
+// Each task declares the context keys it reads (inputs) and writes (outputs).
+// A task depends on the latest earlier task producing each of its inputs, and
+// a task writing a key waits for every earlier reader and writer of it, so
+// declaration order stays the tie-breaker and the DAG can never cycle.
+// Independent tasks run concurrently on a bounded worker pool, optionally
+// capped per command. APPROVAL tasks are hard barriers: they wait for every
+// earlier task and every later task waits for them. The first failure aborts
+// the running siblings through their AbortSignal and cancels whatever has not
+// started. Every run is recorded as Chrome trace events with the critical path
+// marked.
+
+const TASK_TYPES = ['AGENT', 'PROGRAMMATIC', 'APPROVAL'];
+
+const DEFAULT_OPTIONS = {
+  workers: 4,
+  // Per-command concurrency caps, e.g. { QA: 3 }
+  commandLimits: {}
+};
+
+class TaskCancelledError extends Error {
+  constructor(taskId, cause) {
+    super(`Task "${taskId}" cancelled after "${cause}" failed`);
+    this.name = 'TaskCancelledError';
+    this.taskId = taskId;
+  }
+}
+
+class StepScheduler {
+  constructor(options = {}) {
+    this.options = { ...DEFAULT_OPTIONS, ...options };
+    this.tasks = [];
+    this.byId = new Map();
+    this.events = [];
+  }
+
+  // task: { id, command, step, type, inputs, outputs, run(inputs, { signal }) }
+  // `run` resolves to an object holding the declared outputs
+  addTask(task) {
+    if (this.byId.has(task.id)) throw new Error(`Duplicate task id "${task.id}"`);
+    const type = task.type || 'AGENT';
+    if (!TASK_TYPES.includes(type)) throw new Error(`Unknown task type "${type}" for "${task.id}"`);
+    const entry = { inputs: [], outputs: [], command: 'DEFAULT', ...task, type, index: this.tasks.length };
+    this.tasks.push(entry);
+    this.byId.set(entry.id, entry);
+    return this;
+  }
+
+  addTasks(tasks) {
+    for (const task of tasks) this.addTask(task);
+    return this;
+  }
+
+  // ------------------------------------------------------------------- graph
+
+  // Returns Map<taskId, Set<taskId>> of direct dependencies. Keys present in
+  // the initial context count as already produced.
+  buildGraph(initialKeys = []) {
+    const producers = new Map(initialKeys.map(key => [key, null]));
+    // Tasks that read each key since its last write
+    const readers = new Map();
+    const dependencies = new Map();
+    let lastBarrier = null;
+    let sinceBarrier = [];
+    for (const task of this.tasks) {
+      const deps = new Set();
+      if (task.type === 'APPROVAL') {
+        for (const id of sinceBarrier) deps.add(id);
+      }
+      if (lastBarrier) deps.add(lastBarrier);
+      for (const input of task.inputs) {
+        if (!producers.has(input)) {
+          throw new Error(`Task "${task.id}" reads "${input}" but no earlier task or the initial context provides it`);
+        }
+        const producer = producers.get(input);
+        if (producer) deps.add(producer);
+      }
+      // Write-after-read and write-after-write: an overwrite must not be seen
+      // by earlier readers or be clobbered by an earlier, slower writer
+      for (const output of task.outputs) {
+        if (producers.get(output)) deps.add(producers.get(output));
+        for (const reader of readers.get(output) || []) deps.add(reader);
+      }
+      deps.delete(task.id);
+      for (const input of task.inputs) {
+        if (!readers.has(input)) readers.set(input, []);
+        readers.get(input).push(task.id);
+      }
+      for (const output of task.outputs) {
+        producers.set(output, task.id);
+        readers.set(output, []);
+      }
+      dependencies.set(task.id, deps);
+
+      if (task.type === 'APPROVAL') {
+        lastBarrier = task.id;
+        sinceBarrier = [];
+      } else {
+        sinceBarrier.push(task.id);
+      }
+    }
+    return dependencies;
+  }
+
+  // --------------------------------------------------------------- execution
+
+  async run(initialContext = {}) {
+    const context = { ...initialContext };
+    const dependencies = this.buildGraph(Object.keys(context));
+    const dependents = new Map(this.tasks.map(task => [task.id, []]));
+    const waiting = new Map();
+    for (const [id, deps] of dependencies) {
+      waiting.set(id, deps.size);
+      for (const dep of deps) dependents.get(dep).push(id);
+    }
+
+    const { workers, commandLimits } = this.options;
+    const controller = new AbortController();
+    // Every running task may listen on the shared signal
+    setMaxListeners(0, controller.signal);
+    const ready = this.tasks.filter(task => waiting.get(task.id) === 0);
+    const runningPerCommand = new Map();
+    const freeLanes = Array.from({ length: workers }, (_, i) => workers - i);
+    const timings = new Map();
+    const status = new Map();
+    const origin = process.hrtime.bigint();
+    const now = () => Number(process.hrtime.bigint() - origin) / 1e3;
+    let running = 0;
+    let failure = null;
+
+    const canStart = task => {
+      const limit = commandLimits[task.command];
+      return limit === undefined || (runningPerCommand.get(task.command) || 0) < limit;
+    };
+
+    await new Promise(resolve => {
+      const finish = (task, lane, outcome, error) => {
+        timings.get(task.id).end = now();
+        status.set(task.id, outcome);
+        running--;
+        runningPerCommand.set(task.command, runningPerCommand.get(task.command) - 1);
+        freeLanes.push(lane);
+        if (outcome === 'failed' && !failure) {
+          failure = { task: task.id, error };
+          controller.abort();
+        }
+        if (outcome === 'done') {
+          for (const id of dependents.get(task.id)) {
+            waiting.set(id, waiting.get(id) - 1);
+            if (waiting.get(id) === 0) ready.push(this.byId.get(id));
+          }
+          ready.sort((a, b) => a.index - b.index);
+        }
+        pump();
+      };
+
+      const start = task => {
+        const lane = freeLanes.pop();
+        running++;
+        runningPerCommand.set(task.command, (runningPerCommand.get(task.command) || 0) + 1);
+        timings.set(task.id, { start: now(), lane });
+        status.set(task.id, 'running');
+        const inputs = Object.fromEntries(task.inputs.map(key => [key, context[key]]));
+        Promise.resolve()
+          .then(() => task.run(inputs, { signal: controller.signal, task }))
+          .then(result => {
+            if (controller.signal.aborted) return finish(task, lane, 'cancelled');
+            for (const key of task.outputs) context[key] = result ? result[key] : undefined;
+            finish(task, lane, 'done');
+          }, error => finish(task, lane, controller.signal.aborted ? 'cancelled' : 'failed', error));
+      };
+
+      const pump = () => {
+        if (failure) ready.length = 0;
+        for (let i = 0; i < ready.length && running < workers;) {
+          if (canStart(ready[i])) {
+            start(ready.splice(i, 1)[0]);
+          } else {
+            i++;
+          }
+        }
+        if (running === 0) resolve();
+      };
+
+      pump();
+    });
+
+    for (const task of this.tasks) if (!status.has(task.id)) status.set(task.id, 'cancelled');
+    this.events = this._traceEvents(dependencies, timings, status);
+    const wallMs = Math.max(0, ...[...timings.values()].map(t => t.end)) / 1e3;
+
+    if (failure) {
+      const error = failure.error instanceof Error ? failure.error : new Error(String(failure.error));
+      error.taskId = failure.task;
+      error.cancelled = [...status].filter(([, s]) => s === 'cancelled')
+        .map(([id]) => new TaskCancelledError(id, failure.task));
+      throw error;
+    }
+    return { context, status, wallMs, criticalPath: this.criticalPath };
+  }
+
+  // ------------------------------------------------------------------- trace
+
+  // Walks back from the last task to finish through whichever dependency
+  // released it last; that chain is what bounds the wall-clock time
+  _criticalPath(dependencies, timings) {
+    let current = null;
+    for (const [id, timing] of timings) {
+      if (!current || timing.end > timings.get(current).end) current = id;
+    }
+    const chain = [];
+    while (current) {
+      chain.unshift(current);
+      let gate = null;
+      for (const dep of dependencies.get(current)) {
+        if (timings.has(dep) && (!gate || timings.get(dep).end > timings.get(gate).end)) gate = dep;
+      }
+      current = gate;
+    }
+    return chain;
+  }
+
+  _traceEvents(dependencies, timings, status) {
+    this.criticalPath = this._criticalPath(dependencies, timings);
+    const critical = new Set(this.criticalPath);
+    const events = [{ name: 'process_name', ph: 'M', pid: 1, tid: 0, args: { name: 'StepScheduler' } }];
+    for (let lane = 1; lane <= this.options.workers; lane++) {
+      events.push({ name: 'thread_name', ph: 'M', pid: 1, tid: lane, args: { name: `worker ${lane}` } });
+    }
+    for (const task of this.tasks) {
+      const timing = timings.get(task.id);
+      if (!timing) continue;
+      events.push({
+        name: task.id,
+        cat: critical.has(task.id) ? `${task.type},critical` : task.type,
+        ph: 'X',
+        ts: Math.round(timing.start),
+        dur: Math.max(1, Math.round(timing.end - timing.start)),
+        pid: 1,
+        tid: timing.lane,
+        args: {
+          command: task.command,
+          step: task.step,
+          status: status.get(task.id),
+          critical: critical.has(task.id),
+          dependsOn: [...dependencies.get(task.id)]
+        }
+      });
+    }
+    // Flow arrows along the critical path
+    this.criticalPath.slice(1).forEach((id, i) => {
+      const from = timings.get(this.criticalPath[i]);
+      const to = timings.get(id);
+      events.push({ name: 'critical', cat: 'critical', ph: 's', id: i, pid: 1, tid: from.lane, ts: Math.round(from.end) - 1 });
+      events.push({ name: 'critical', cat: 'critical', ph: 'f', bp: 'e', id: i, pid: 1, tid: to.lane, ts: Math.round(to.start) });
+    });
+    return events;
+  }
+
+  exportTrace(filePath) {
+    const trace = { traceEvents: this.events, displayTimeUnit: 'ms', otherData: { criticalPath: this.criticalPath } };
+    if (filePath) fs.writeFileSync(filePath, JSON.stringify(trace));
+    return trace;
+  }
+}
+
+// ------------------------------------------------------------------ benchmark
+
+function simulated(ms) {
+  return (inputs, { signal }) => new Promise((resolve, reject) => {
+    const onAbort = () => {
+      clearTimeout(timer);
+      reject(new Error('aborted'));
+    };
+    const timer = setTimeout(() => {
+      signal.removeEventListener('abort', onAbort);
+      resolve({});
+    }, ms);
+    signal.addEventListener('abort', onAbort, { once: true });
+  });
+}
+
+// PLAN Steps 1-9 with their inputs/outputs; durations stand in for agent
+// calls. Approval checkpoints (Steps 3, 5, 8) are instant here.
+function planTasks(scale = 1) {
+  const agent = (id, step, inputs, outputs, ms) =>
+    ({ id, command: 'PLAN', step, type: 'AGENT', inputs, outputs, run: simulated(ms * scale) });
+  const programmatic = (id, step, inputs, outputs, ms) =>
+    ({ id, command: 'PLAN', step, type: 'PROGRAMMATIC', inputs, outputs, run: simulated(ms * scale) });
+  const approval = (id, step, inputs) =>
+    ({ id, command: 'PLAN', step, type: 'APPROVAL', inputs, outputs: [], run: simulated(0) });
+  return [
+    programmatic('init-db', 1, ['request'], ['db'], 20),
+    programmatic('start-learning', 1, ['request'], ['session'], 20),
+    agent('load-patterns', 1, ['session'], ['patterns'], 60),
+    agent('apply-adaptations', 1, ['patterns'], ['adaptations'], 40),
+    agent('interpretation', 2, ['request'], ['interpretation'], 80),
+    agent('alternatives', 2, ['interpretation'], ['alternatives'], 60),
+    agent('stack-options', 2, ['interpretation', 'patterns'], ['stackOptions'], 60),
+    agent('scope-options', 2, ['interpretation'], ['scopeOptions'], 50),
+    agent('questions', 2, ['alternatives', 'stackOptions', 'scopeOptions'], ['questions'], 40),
+    agent('understanding-summary', 3, ['questions', 'adaptations'], ['summary'], 40),
+    approval('approve-understanding', 3, ['summary']),
+    agent('bmad-stakeholders', 4, ['summary'], ['stakeholders'], 120),
+    agent('sage-pattern-matching', 4, ['summary', 'patterns'], ['matches'], 100),
+    agent('archon-knowledge', 4, ['summary'], ['knowledge'], 110),
+    agent('risk-patterns', 4, ['summary', 'patterns'], ['risks'], 90),
+    agent('combined-recommendations', 4, ['stakeholders', 'matches', 'knowledge', 'risks'], ['recommendations'], 60),
+    agent('settings', 5, ['recommendations'], ['settings'], 50),
+    approval('approve-settings', 5, ['settings']),
+    agent('mcp-capabilities', 6, ['settings'], ['capabilities'], 60),
+    agent('mcp-fallbacks', 6, ['capabilities'], ['fallbacks'], 30),
+    agent('feature-extraction', 7, ['recommendations'], ['features'], 90),
+    agent('validation-gates', 7, ['features'], ['gates'], 60),
+    agent('dependency-analysis', 7, ['features', 'patterns'], ['dependencies'], 70),
+    programmatic('prototype-definitions', 7, ['gates', 'dependencies', 'fallbacks'], ['prototypes'], 20),
+    agent('implementation-plan', 8, ['prototypes'], ['plan'], 100),
+    agent('risk-mitigation', 8, ['prototypes', 'risks'], ['mitigation'], 80),
+    agent('success-metrics', 8, ['prototypes'], ['metrics'], 60),
+    programmatic('kanban-structure', 8, ['plan'], ['kanban'], 20),
+    approval('approve-plan', 8, ['plan', 'mitigation', 'metrics', 'kanban']),
+    agent('planning-patterns', 9, ['plan'], ['planningPatterns'], 50),
+    agent('methodology-effectiveness', 9, ['plan'], ['effectiveness'], 50),
+    programmatic('save-learning', 9, ['planningPatterns', 'effectiveness'], ['saved'], 20)
+  ];
+}
+
+async function runBenchmark() {
+  const sequential = new StepScheduler({ workers: 1 }).addTasks(planTasks());
+  const sequentialRun = await sequential.run({ request: 'Kanban board with realtime updates' });
+
+  const parallel = new StepScheduler({ workers: 4, commandLimits: { PLAN: 4 } }).addTasks(planTasks());
+  const parallelRun = await parallel.run({ request: 'Kanban board with realtime updates' });
+  const tracePath = path.join(os.tmpdir(), 'plan_step_trace.json');
+  parallel.exportTrace(tracePath);
+
+  console.table([
+    { mode: 'sequential (1 worker)', 'wall ms': sequentialRun.wallMs.toFixed(0), tasks: sequential.tasks.length },
+    { mode: 'DAG (4 workers)', 'wall ms': parallelRun.wallMs.toFixed(0), tasks: parallel.tasks.length }
+  ]);
+  console.log(`\n⏱️  Speed-up: ${(sequentialRun.wallMs / parallelRun.wallMs).toFixed(2)}x`);
+  console.log(`🧭 Critical path: ${parallelRun.criticalPath.join(' → ')}`);
+  console.log(`📄 Chrome trace written to ${tracePath} (open in chrome://tracing or Perfetto)`);
+}
+
+if (require.main === module) {
+  console.log('🗂️  Step scheduler benchmark (sequential PLAN vs dependency DAG)\n');
+  runBenchmark().catch(error => {
+    console.error('❌ Benchmark failed:', error);
+    process.exit(1);
+  });
+}
+
+module.exports = { StepScheduler, TaskCancelledError, TASK_TYPES };
@@ -0,0 +1,375 @@
+const crypto = require('crypto');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+// Memoized, parallel pre-step validation for realtime_state_validator and
+// smart_dependency_validator.
+//
+// Every check declares what its result depends on: files (lockfiles, the MCP
+// index), SQLite databases (by schema cookie and user_version) and
+// environment variables. The cache fingerprints exactly those inputs and
+// reuses the previous result while the fingerprint is unchanged. File
+// fingerprints are themselves cached: every pass compares size/mtime, and a
+// file is only re-hashed (or its header re-read) when those move or a watch
+// event dropped its cached fingerprint, so a warm validation pass costs one
+// stat per input. Watch events only catch changes that keep size and mtime;
+// they arrive asynchronously, so they are never the only signal. Checks that
+// miss run on a shared pool with bounded concurrency and a per-check timeout;
+// per-check latency histograms and the hit ratio are exposed for the tRPC
+// router.
+
+const LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+
+const DEFAULT_OPTIONS = {
+  concurrency: 8,
+  timeoutMs: 10000,
+  watch: true
+};
+
+class ValidationTimeoutError extends Error {
+  constructor(name, timeoutMs) {
+    super(`Validation "${name}" timed out after ${timeoutMs}ms`);
+    this.name = 'ValidationTimeoutError';
+    this.check = name;
+  }
+}
+
+function sha1(value) {
+  return crypto.createHash('sha1').update(value).digest('hex');
+}
+
+class Histogram {
+  constructor(buckets = LATENCY_BUCKETS_MS) {
+    this.buckets = buckets;
+    this.counts = new Array(buckets.length + 1).fill(0);
+    this.count = 0;
+    this.sum = 0;
+  }
+
+  observe(value) {
+    let i = 0;
+    while (i < this.buckets.length && value > this.buckets[i]) i++;
+    this.counts[i]++;
+    this.count++;
+    this.sum += value;
+  }
+
+  quantile(q) {
+    if (this.count === 0) return 0;
+    const rank = q * this.count;
+    let seen = 0;
+    for (let i = 0; i < this.counts.length; i++) {
+      seen += this.counts[i];
+      if (seen >= rank) return i < this.buckets.length ? this.buckets[i] : Infinity;
+    }
+    return Infinity;
+  }
+
+  toJSON() {
+    return {
+      buckets: this.buckets.map((le, i) => ({ le, count: this.counts[i] }))
+        .concat({ le: '+Inf', count: this.counts[this.buckets.length] }),
+      count: this.count,
+      sumMs: this.sum,
+      p50Ms: this.quantile(0.5),
+      p99Ms: this.quantile(0.99)
+    };
+  }
+}
+
+// Bounded async pool shared by every validator
+class AsyncPool {
+  constructor(concurrency) {
+    this.concurrency = concurrency;
+    this.active = 0;
+    this.queue = [];
+  }
+
+  run(fn) {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ fn, resolve, reject });
+      this._next();
+    });
+  }
+
+  _next() {
+    while (this.active < this.concurrency && this.queue.length > 0) {
+      const { fn, resolve, reject } = this.queue.shift();
+      this.active++;
+      Promise.resolve()
+        .then(fn)
+        .then(resolve, reject)
+        .finally(() => {
+          this.active--;
+          this._next();
+        });
+    }
+  }
+}
+
+class ValidationCache {
+  constructor(options = {}) {
+    this.options = { ...DEFAULT_OPTIONS, ...options };
+    this.pool = new AsyncPool(this.options.concurrency);
+    this.results = new Map();
+    this.fileFingerprints = new Map();
+    this.watchers = new Map();
+    this.histograms = new Map();
+    this.counters = { hits: 0, misses: 0, timeouts: 0, failures: 0, invalidations: 0 };
+  }
+
+  // ------------------------------------------------------------ fingerprints
+
+  _watch(file) {
+    if (!this.options.watch) return false;
+    const dir = path.dirname(file);
+    if (this.watchers.has(dir)) return this.watchers.get(dir) !== null;
+    try {
+      const watcher = fs.watch(dir, { persistent: false }, (event, name) => {
+        // Some platforms omit the name; then every file in the directory is suspect
+        for (const known of this.fileFingerprints.keys()) {
+          if (path.dirname(known) === dir && (!name || path.basename(known) === String(name))) this.invalidate(known);
+        }
+      });
+      watcher.on('error', () => {
+        watcher.close();
+        this.watchers.set(dir, null);
+      });
+      this.watchers.set(dir, watcher);
+      return true;
+    } catch {
+      this.watchers.set(dir, null);
+      return false;
+    }
+  }
+
+  _statKey(file) {
+    try {
+      const stat = fs.statSync(file);
+      return `${stat.size}:${stat.mtimeMs}`;
+    } catch (error) {
+      if (error.code !== 'ENOENT') throw error;
+      return 'missing';
+    }
+  }
+
+  // Returns the cached value while size/mtime are unchanged and no watch
+  // event dropped it; otherwise recomputes it. A path may be fingerprinted
+  // several ways (content, stat, schema), each cached separately under it.
+  // The watcher is registered before the stat so a change racing the first
+  // fingerprint is still seen.
+  _cachedFingerprint(file, kind, compute) {
+    this._watch(file);
+    const statKey = this._statKey(file);
+    if (!this.fileFingerprints.has(file)) this.fileFingerprints.set(file, new Map());
+    const kinds = this.fileFingerprints.get(file);
+    const cached = kinds.get(kind);
+    if (cached && cached.statKey === statKey) return cached.value;
+    const value = statKey === 'missing' ? statKey : compute(statKey);
+    kinds.set(kind, { value, statKey });
+    return value;
+  }
+
+  // Content hash for lockfiles, size+mtime for everything else
+  _fileFingerprint(file, { content }) {
+    return content
+      ? this._cachedFingerprint(file, 'content', () => sha1(fs.readFileSync(file)))
+      : this._cachedFingerprint(file, 'stat', statKey => statKey);
+  }
+
+  // Schema cookie (offset 40) and user_version (offset 60) of a SQLite file;
+  // both change on every schema migration
+  _schemaFingerprint(file) {
+    return this._cachedFingerprint(file, 'schema', () => {
+      const header = Buffer.alloc(64);
+      const fd = fs.openSync(file, 'r');
+      try {
+        fs.readSync(fd, header, 0, 64, 0);
+      } finally {
+        fs.closeSync(fd);
+      }
+      return `${header.readUInt32BE(40)}:${header.readUInt32BE(60)}`;
+    });
+  }
+
+  // check.inputs: { lockfiles, files, databases, env }
+  fingerprint(check) {
+    const inputs = check.inputs || {};
+    const parts = [check.name];
+    for (const file of inputs.lockfiles || []) parts.push(`L${file}=${this._fileFingerprint(path.resolve(file), { content: true })}`);
+    for (const file of inputs.files || []) parts.push(`F${file}=${this._fileFingerprint(path.resolve(file), { content: false })}`);
+    for (const file of inputs.databases || []) parts.push(`D${file}=${this._schemaFingerprint(path.resolve(file))}`);
+    for (const name of inputs.env || []) parts.push(`E${name}=${process.env[name] ?? ''}`);
+    return sha1(parts.join('\n'));
+  }
+
+  // Drops every cached fingerprint of a file; results keyed on the old
+  // fingerprints simply stop matching
+  invalidate(file) {
+    if (this.fileFingerprints.delete(path.resolve(file))) this.counters.invalidations++;
+  }
+
+  // ---------------------------------------------------------------- running
+
+  _histogram(name) {
+    if (!this.histograms.has(name)) this.histograms.set(name, new Histogram());
+    return this.histograms.get(name);
+  }
+
+  async _execute(check, key) {
+    const timeoutMs = check.timeoutMs || this.options.timeoutMs;
+    const controller = new AbortController();
+    const start = process.hrtime.bigint();
+    let timer;
+    const timeout = new Promise((_, reject) => {
+      timer = setTimeout(() => {
+        controller.abort();
+        reject(new ValidationTimeoutError(check.name, timeoutMs));
+      }, timeoutMs);
+    });
+    try {
+      const result = await Promise.race([check.run({ signal: controller.signal }), timeout]);
+      // Only successful results are cached; failures are retried next step
+      if (!result || result.valid !== false) this.results.set(check.name, { key, result });
+      return { name: check.name, cached: false, result };
+    } catch (error) {
+      if (error instanceof ValidationTimeoutError) {
+        this.counters.timeouts++;
+      } else {
+        this.counters.failures++;
+      }
+      return { name: check.name, cached: false, error };
+    } finally {
+      clearTimeout(timer);
+      this._histogram(check.name).observe(Number(process.hrtime.bigint() - start) / 1e6);
+    }
+  }
+
+  // Runs a list of checks, serving unchanged ones from cache and the rest
+  // concurrently on the shared pool
+  async validate(checks) {
+    return Promise.all(checks.map(check => {
+      const key = this.fingerprint(check);
+      const cached = this.results.get(check.name);
+      if (cached && cached.key === key) {
+        this.counters.hits++;
+        return { name: check.name, cached: true, result: cached.result };
+      }
+      this.counters.misses++;
+      return this.pool.run(() => this._execute(check, key));
+    }));
+  }
+
+  metrics() {
+    const { hits, misses } = this.counters;
+    return {
+      ...this.counters,
+      hitRatio: hits + misses === 0 ? 0 : hits / (hits + misses),
+      checks: Object.fromEntries([...this.histograms].map(([name, histogram]) => [name, histogram.toJSON()]))
+    };
+  }
+
+  reset() {
+    this.results.clear();
+    this.fileFingerprints.clear();
+  }
+
+  close() {
+    for (const watcher of this.watchers.values()) if (watcher) watcher.close();
+    this.watchers.clear();
+  }
+}
+
+// Builds the validation sub-router from the server's tRPC instance, e.g.
+//   validation: createValidationRouter(t, validationCache)
+function createValidationRouter(t, cache) {
+  return t.router({
+    metrics: t.procedure.query(() => cache.metrics()),
+    reset: t.procedure.mutation(() => {
+      cache.reset();
+      return { ok: true };
+    })
+  });
+}
+
+// ------------------------------------------------------------------ benchmark
+
+function simulatedCheck(name, ms, inputs) {
+  return {
+    name,
+    inputs,
+    run: ({ signal }) => new Promise((resolve, reject) => {
+      const timer = setTimeout(() => resolve({ valid: true }), ms);
+      signal.addEventListener('abort', () => {
+        clearTimeout(timer);
+        reject(new Error('aborted'));
+      }, { once: true });
+    })
+  };
+}
+
+async function runBenchmark({ steps = 30 } = {}) {
+  const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'validation-cache-bench-'));
+  const lockfile = path.join(workDir, 'package-lock.json');
+  const mcpIndex = path.join(workDir, 'mcp_index.json');
+  const database = path.join(workDir, 'app.sqlite');
+  fs.writeFileSync(lockfile, JSON.stringify({ lockfileVersion: 3, packages: { a: '1.0.0' } }));
+  fs.writeFileSync(mcpIndex, JSON.stringify({ servers: ['puppeteer', 'filesystem'] }));
+  const header = Buffer.alloc(4096);
+  header.write('SQLite format 3\u0000', 0, 'latin1');
+  header.writeUInt32BE(1, 40);
+  fs.writeFileSync(database, header);
+
+  const checks = [
+    simulatedCheck('node-dependencies', 120, { lockfiles: [lockfile] }),
+    simulatedCheck('python-dependencies', 150, { lockfiles: [lockfile], env: ['VIRTUAL_ENV'] }),
+    simulatedCheck('database-schema', 60, { databases: [database] }),
+    simulatedCheck('database-connection', 40, { databases: [database], env: ['DATABASE_URL'] }),
+    simulatedCheck('mcp-capabilities', 200, { files: [mcpIndex] }),
+    simulatedCheck('puppeteer-available', 90, { files: [mcpIndex], lockfiles: [lockfile] }),
+    simulatedCheck('disk-space', 30, { env: ['HOME'] }),
+    simulatedCheck('ports-3010-3011', 50, { env: ['PORT'] })
+  ];
+
+  // Current behaviour: every check, every step, one after another
+  let start = Date.now();
+  for (let step = 0; step < steps; step++) {
+    for (const check of checks) await check.run({ signal: new AbortController().signal });
+  }
+  const baselineMs = Date.now() - start;
+
+  const cache = new ValidationCache();
+  start = Date.now();
+  for (let step = 0; step < steps; step++) {
+    if (step === 10) fs.appendFileSync(lockfile, '\n');
+    if (step === 20) {
+      header.writeUInt32BE(2, 40);
+      fs.writeFileSync(database, header);
+    }
+    await cache.validate(checks);
+  }
+  const cachedMs = Date.now() - start;
+  const metrics = cache.metrics();
+  cache.close();
+
+  console.table([
+    { mode: 'sequential, every step', 'total ms': baselineMs, 'ms per step': (baselineMs / steps).toFixed(1) },
+    { mode: 'memoized + parallel', 'total ms': cachedMs, 'ms per step': (cachedMs / steps).toFixed(1) }
+  ]);
+  console.log(`\n🎯 Cache hit ratio ${(metrics.hitRatio * 100).toFixed(1)}% ` +
+    `(${metrics.hits} hits, ${metrics.misses} misses, ${metrics.invalidations} invalidations)`);
+  console.table(Object.entries(metrics.checks).map(([name, h]) =>
+    ({ check: name, runs: h.count, 'p50 ≤ ms': h.p50Ms, 'p99 ≤ ms': h.p99Ms })));
+  fs.rmSync(workDir, { recursive: true, force: true });
+}
+
+if (require.main === module) {
+  console.log('✅ Pre-step validation benchmark (re-validate every step vs memoized parallel)\n');
+  runBenchmark().catch(error => {
+    console.error('❌ Benchmark failed:', error);
+    process.exit(1);
+  });
+}
+
+module.exports = { ValidationCache, ValidationTimeoutError, Histogram, AsyncPool, createValidationRouter };
@@ -0,0 +1,433 @@
+const fs = require('fs');
+const http = require('http');
+const path = require('path');
+
+// Pooled, parallel runner for the Web Frontend Validation Protocol.
+//
+// test_puppeteer.js launches a fresh Chromium per validation and walks the
+// checklist one item at a time. Here a BrowserPool keeps a few browsers
+// running and hands out isolated browser contexts (separate cookies, storage
+// and cache), and a job queue runs checklist items and user journeys across
+// those contexts concurrently. Performance mode (OPTIMIZE) records navigation
+// timing, paint timing and Chrome metrics per page, and compareRuns() turns
+// two such runs into a before/after JSON report. A built-in static server
+// lets the whole thing run offline against a build directory.
+
+const DEFAULT_POOL_OPTIONS = {
+  browsers: 1,
+  contextsPerBrowser: 8,
+  launch: {
+    headless: 'new',
+    args: ['--no-sandbox', '--disable-setuid-sandbox']
+  }
+};
+
+const DEFAULT_RUN_OPTIONS = {
+  concurrency: 8,
+  timeoutMs: 30000,
+  viewport: { width: 1280, height: 720 },
+  screenshotDir: null,
+  performance: false
+};
+
+const KANBAN_SELECTOR = '[class*="kanban"], [class*="board"], [class*="column"], [class*="todo"], [class*="progress"], [class*="done"]';
+const PROJECT_SELECTOR = 'input, button, form, [class*="project"]';
+
+// -------------------------------------------------------------- browser pool
+
+class BrowserPool {
+  constructor(options = {}) {
+    this.options = { ...DEFAULT_POOL_OPTIONS, ...options };
+    this.browsers = [];
+    this.waiting = [];
+    this.launching = 0;
+    this.counters = { launches: 0, contexts: 0 };
+  }
+
+  async _launch() {
+    // Loaded on first use so compare and the static server work without it
+    const puppeteer = require('puppeteer');
+    const browser = await puppeteer.launch(this.options.launch);
+    this.counters.launches++;
+    // Born reserved for the acquire that launched it
+    const slot = { browser, active: 1 };
+    // A crashed browser is dropped and replaced on the next acquire
+    browser.on('disconnected', () => {
+      this.browsers = this.browsers.filter(entry => entry !== slot);
+    });
+    this.browsers.push(slot);
+    return slot;
+  }
+
+  // Resolves to a slot with one context reserved for the caller. The
+  // reservation is taken synchronously, so waiters woken together cannot
+  // all claim the same free capacity.
+  async _slot() {
+    const { browsers, contextsPerBrowser } = this.options;
+    const free = this.browsers
+      .filter(slot => slot.active < contextsPerBrowser)
+      .sort((a, b) => a.active - b.active)[0];
+    if (free) {
+      free.active++;
+      return free;
+    }
+    if (this.browsers.length + this.launching < browsers) {
+      this.launching++;
+      try {
+        return await this._launch();
+      } finally {
+        this.launching--;
+        // A new browser (or a failed launch) changes capacity for everyone waiting
+        for (const wake of this.waiting.splice(0)) wake();
+      }
+    }
+    await new Promise(resolve => this.waiting.push(resolve));
+    return this._slot();
+  }
+
+  // Returns an isolated context; release() closes it and frees the slot
+  async acquire() {
+    const slot = await this._slot();
+    this.counters.contexts++;
+    try {
+      const context = slot.browser.createBrowserContext
+        ? await slot.browser.createBrowserContext()
+        : await slot.browser.createIncognitoBrowserContext();
+      return {
+        context,
+        release: async () => {
+          await context.close().catch(() => {});
+          slot.active--;
+          const next = this.waiting.shift();
+          if (next) next();
+        }
+      };
+    } catch (error) {
+      slot.active--;
+      const next = this.waiting.shift();
+      if (next) next();
+      throw error;
+    }
+  }
+
+  async close() {
+    await Promise.all(this.browsers.map(slot => slot.browser.close().catch(() => {})));
+    this.browsers = [];
+  }
+}
+
+// ---------------------------------------------------------------- page checks
+
+// Attaches console/response listeners before navigation
+function observePage(page) {
+  const observed = { consoleErrors: [], consoleWarnings: [], httpErrors: [], apiResponses: [] };
+  page.on('console', message => {
+    if (message.type() === 'error') observed.consoleErrors.push(message.text());
+    if (message.type() === 'warning' || message.type() === 'warn') observed.consoleWarnings.push(message.text());
+  });
+  page.on('pageerror', error => observed.consoleErrors.push(error.message));
+  page.on('response', response => {
+    if (response.status() >= 400) observed.httpErrors.push({ url: response.url(), status: response.status() });
+    if (response.url().includes('/trpc/')) {
+      observed.apiResponses.push({ url: response.url(), status: response.status() });
+    }
+  });
+  return observed;
+}
+
+// Navigation and paint timing from the page plus Chrome's own counters
+async function capturePerformance(page) {
+  const timing = await page.evaluate(() => {
+    const [navigation] = performance.getEntriesByType('navigation');
+    const paints = Object.fromEntries(performance.getEntriesByType('paint').map(entry => [entry.name, entry.startTime]));
+    const resources = performance.getEntriesByType('resource');
+    return {
+      ttfbMs: navigation ? navigation.responseStart - navigation.requestStart : null,
+      domContentLoadedMs: navigation ? navigation.domContentLoadedEventEnd : null,
+      loadMs: navigation ? navigation.loadEventEnd : null,
+      firstPaintMs: paints['first-paint'] ?? null,
+      firstContentfulPaintMs: paints['first-contentful-paint'] ?? null,
+      transferBytes: resources.reduce((sum, entry) => sum + (entry.transferSize || 0), navigation ? navigation.transferSize : 0),
+      resourceCount: resources.length
+    };
+  });
+  const metrics = await page.metrics();
+  return {
+    ...timing,
+    scriptDurationMs: metrics.ScriptDuration * 1000,
+    layoutDurationMs: metrics.LayoutDuration * 1000,
+    recalcStyleDurationMs: metrics.RecalcStyleDuration * 1000,
+    taskDurationMs: metrics.TaskDuration * 1000,
+    jsHeapUsedBytes: metrics.JSHeapUsedSize,
+    domNodes: metrics.Nodes
+  };
+}
+
+// The IMPLEMENT checklist from the validation protocol, as one job per URL
+async function basicChecklist(page, job, options) {
+  const result = {};
+  await page.waitForSelector(job.rootSelector || '#root, body', { timeout: 10000 });
+  result.title = await page.title();
+  result.elements = {};
+  const selectors = job.selectors || { project: PROJECT_SELECTOR, kanban: KANBAN_SELECTOR };
+  for (const [name, selector] of Object.entries(selectors)) {
+    result.elements[name] = (await page.$(selector)) !== null;
+  }
+  result.passed = Object.values(result.elements).every(Boolean);
+  if (options.screenshotDir) {
+    fs.mkdirSync(options.screenshotDir, { recursive: true });
+    result.screenshot = path.join(options.screenshotDir, `${job.name.replace(/[^a-z0-9-]+/gi, '_')}.png`);
+    await page.screenshot({ path: result.screenshot, fullPage: true });
+  }
+  // Basic interaction: focus the first input and click the first enabled button
+  const input = await page.$('input:not([type="hidden"]):not([disabled])');
+  if (input) await input.type('validation');
+  const button = await page.$('button:not([disabled])');
+  result.interactive = Boolean(input || button);
+  if (button) await button.click().catch(() => { result.interactive = false; });
+  return result;
+}
+
+// ---------------------------------------------------------------- job runner
+
+// job: { name, url, journey?(page), selectors?, rootSelector? }
+// A job without a journey runs the basic checklist.
+async function runJob(pool, job, options) {
+  const started = Date.now();
+  let lease = null;
+  try {
+    // Inside the try: a failed launch or context fails this job, not the run
+    lease = await pool.acquire();
+    const page = await lease.context.newPage();
+    await page.setViewport(job.viewport || options.viewport);
+    page.setDefaultTimeout(options.timeoutMs);
+    const observed = observePage(page);
+    await page.goto(job.url, { waitUntil: 'networkidle2', timeout: options.timeoutMs });
+    const checks = job.journey ? await job.journey(page) : await basicChecklist(page, job, options);
+    const performanceMetrics = options.performance ? await capturePerformance(page) : undefined;
+    const passed = observed.consoleErrors.length === 0 && observed.httpErrors.length === 0 &&
+      (!checks || checks.passed !== false);
+    return { name: job.name, url: job.url, passed, durationMs: Date.now() - started, checks, ...observed, performance: performanceMetrics };
+  } catch (error) {
+    return { name: job.name, url: job.url, passed: false, durationMs: Date.now() - started, error: error.message };
+  } finally {
+    if (lease) await lease.release();
+  }
+}
+
+// Runs jobs concurrently across pooled contexts; results keep job order
+async function runValidations(pool, jobs, options = {}) {
+  const settings = { ...DEFAULT_RUN_OPTIONS, ...options };
+  const results = new Array(jobs.length);
+  let next = 0;
+  const worker = async () => {
+    while (next < jobs.length) {
+      const index = next++;
+      results[index] = await runJob(pool, jobs[index], settings);
+    }
+  };
+  const started = Date.now();
+  await Promise.all(Array.from({ length: Math.min(settings.concurrency, jobs.length) }, worker));
+  const elapsedMs = Date.now() - started;
+  return {
+    results,
+    passed: results.filter(result => result.passed).length,
+    failed: results.filter(result => !result.passed).length,
+    elapsedMs,
+    validationsPerMinute: (jobs.length / elapsedMs) * 60000
+  };
+}
+
+// ------------------------------------------------------- before/after report
+
+const LOWER_IS_BETTER = ['ttfbMs', 'domContentLoadedMs', 'loadMs', 'firstPaintMs', 'firstContentfulPaintMs',
+  'transferBytes', 'resourceCount', 'scriptDurationMs', 'layoutDurationMs', 'recalcStyleDurationMs',
+  'taskDurationMs', 'jsHeapUsedBytes', 'domNodes'];
+
+function median(values) {
+  const sorted = values.filter(value => typeof value === 'number').sort((a, b) => a - b);
+  if (sorted.length === 0) return null;
+  const middle = Math.floor(sorted.length / 2);
+  return sorted.length % 2 ? sorted[middle] : (sorted[middle - 1] + sorted[middle]) / 2;
+}
+
+// Per page and metric: median before/after, change, and whether it regressed
+// beyond `tolerance` (fractional)
+function compareRuns(before, after, { tolerance = 0.05 } = {}) {
+  const byName = run => {
+    const pages = new Map();
+    for (const result of run.results) {
+      if (!result.performance) continue;
+      if (!pages.has(result.name)) pages.set(result.name, []);
+      pages.get(result.name).push(result.performance);
+    }
+    return pages;
+  };
+  const beforePages = byName(before);
+  const afterPages = byName(after);
+  const pages = {};
+  let regressions = 0;
+  for (const [name, beforeSamples] of beforePages) {
+    const afterSamples = afterPages.get(name);
+    if (!afterSamples) continue;
+    pages[name] = {};
+    for (const metric of LOWER_IS_BETTER) {
+      const was = median(beforeSamples.map(sample => sample[metric]));
+      const now = median(afterSamples.map(sample => sample[metric]));
+      if (was === null || now === null) continue;
+      const change = was === 0 ? 0 : (now - was) / was;
+      const regressed = change > tolerance;
+      if (regressed) regressions++;
+      pages[name][metric] = { before: was, after: now, delta: now - was, change: Number(change.toFixed(4)), regressed };
+    }
+  }
+  return { generatedAt: new Date().toISOString(), tolerance, regressions, pages };
+}
+
+// ------------------------------------------------------------- offline mode
+
+const MIME_TYPES = {
+  '.html': 'text/html', '.js': 'text/javascript', '.css': 'text/css', '.json': 'application/json',
+  '.png': 'image/png', '.svg': 'image/svg+xml', '.ico': 'image/x-icon'
+};
+
+// Serves a build directory (falling back to index.html for client routes)
+function startStaticServer(root, port = 0) {
+  const base = path.resolve(root);
+  const server = http.createServer((request, response) => {
+    const urlPath = decodeURIComponent(new URL(request.url, 'http://localhost').pathname);
+    let file = path.resolve(base, `.${path.posix.normalize(urlPath)}`);
+    if (!file.startsWith(base) || !fs.existsSync(file) || fs.statSync(file).isDirectory()) {
+      file = path.join(base, 'index.html');
+    }
+    fs.readFile(file, (error, body) => {
+      if (error) {
+        response.writeHead(404);
+        response.end();
+        return;
+      }
+      response.writeHead(200, { 'Content-Type': MIME_TYPES[path.extname(file)] || 'application/octet-stream' });
+      response.end(body);
+    });
+  });
+  return new Promise(resolve => server.listen(port, '127.0.0.1', () => {
+    resolve({ server, url: `http://127.0.0.1:${server.address().port}`, close: () => new Promise(done => server.close(done)) });
+  }));
+}
+
+// A small Kanban-like page so the runner can be exercised with no app running
+function writeFixture(dir) {
+  fs.mkdirSync(dir, { recursive: true });
+  const columns = ['todo', 'progress', 'done'].map(column =>
+    `<section class="kanban-column ${column}"><h2>${column}</h2>${
+      Array.from({ length: 20 }, (_, i) => `<div class="task">Task ${column}-${i}</div>`).join('')}</section>`).join('');
+  fs.writeFileSync(path.join(dir, 'index.html'), `<!doctype html>
+<html><head><title>BMAD Context Engineering</title><link rel="stylesheet" href="app.css"></head>
+<body><div id="root"><form class="project-form"><input name="project"><button type="button">Create project</button></form>
+<main class="kanban-board">${columns}</main></div><script src="app.js"></script></body></html>`);
+  fs.writeFileSync(path.join(dir, 'app.css'), '.kanban-board{display:flex;gap:8px}.kanban-column{flex:1}.task{padding:4px;border:1px solid #ccc}');
+  fs.writeFileSync(path.join(dir, 'app.js'), "document.querySelector('button').addEventListener('click', () => document.title += ' ✓');");
+}
+
+// --------------------------------------------------------------------- CLI
+
+async function checkServers() {
+  const axios = require('axios');
+  const probe = url => axios.get(url, { timeout: 2000 }).then(() => true, () => false);
+  const [server, client] = await Promise.all([probe('http://localhost:3010/health'), probe('http://localhost:3011')]);
+  return server && client;
+}
+
+// The current approach: one browser launch per validation, run serially
+async function runLegacy(jobs) {
+  const puppeteer = require('puppeteer');
+  const started = Date.now();
+  for (const job of jobs) {
+    const browser = await puppeteer.launch(DEFAULT_POOL_OPTIONS.launch);
+    try {
+      const page = await browser.newPage();
+      await page.setViewport(DEFAULT_RUN_OPTIONS.viewport);
+      observePage(page);
+      await page.goto(job.url, { waitUntil: 'networkidle2', timeout: DEFAULT_RUN_OPTIONS.timeoutMs });
+      await basicChecklist(page, job, DEFAULT_RUN_OPTIONS);
+    } finally {
+      await browser.close();
+    }
+  }
+  const elapsedMs = Date.now() - started;
+  return { elapsedMs, validationsPerMinute: (jobs.length / elapsedMs) * 60000 };
+}
+
+function argValue(args, flag, fallback) {
+  const index = args.indexOf(flag);
+  return index === -1 ? fallback : args[index + 1];
+}
+
+async function main() {
+  const args = process.argv.slice(2);
+
+  if (args[0] === 'compare') {
+    const [beforeFile, afterFile, outFile = 'performance_comparison.json'] = args.slice(1);
+    const report = compareRuns(JSON.parse(fs.readFileSync(beforeFile, 'utf8')), JSON.parse(fs.readFileSync(afterFile, 'utf8')));
+    fs.writeFileSync(outFile, JSON.stringify(report, null, 2));
+    console.log(`📊 ${report.regressions} regressions; comparison written to ${outFile}`);
+    return;
+  }
+
+  const jobCount = Number(argValue(args, '--jobs', 24));
+  let baseUrl = argValue(args, '--url', null);
+  let staticServer = null;
+  if (!baseUrl && !args.includes('--offline') && await checkServers()) baseUrl = 'http://localhost:3011';
+  if (!baseUrl) {
+    const fixtureDir = argValue(args, '--static', null) || path.join(require('os').tmpdir(), 'web-validation-fixture');
+    if (!args.includes('--static')) writeFixture(fixtureDir);
+    staticServer = await startStaticServer(fixtureDir);
+    baseUrl = staticServer.url;
+    console.log(`📁 Offline mode: serving ${fixtureDir} at ${baseUrl}`);
+  }
+
+  const jobs = Array.from({ length: jobCount }, (_, i) => ({ name: `page-${i % 4}`, url: `${baseUrl}/?v=${i}` }));
+  const pool = new BrowserPool({ browsers: 2 });
+  try {
+    if (args.includes('--perf')) {
+      const run = await runValidations(pool, jobs, { performance: true });
+      const outFile = argValue(args, '--out', 'performance_run.json');
+      fs.writeFileSync(outFile, JSON.stringify(run, null, 2));
+      console.log(`⏱️  ${run.passed}/${jobs.length} passed; performance run written to ${outFile}`);
+      console.log('💡 Compare two runs with: node web_validation_runner.js compare before.json after.json');
+      return;
+    }
+
+    const legacyJobs = jobs.slice(0, Math.min(jobs.length, 8));
+    const legacy = await runLegacy(legacyJobs);
+    const pooled = await runValidations(pool, jobs);
+    console.table([
+      { runner: 'launch per validation (serial)', validations: legacyJobs.length, 'elapsed ms': legacy.elapsedMs,
+        'validations/min': legacy.validationsPerMinute.toFixed(1) },
+      { runner: 'browser pool + parallel contexts', validations: jobs.length, 'elapsed ms': pooled.elapsedMs,
+        'validations/min': pooled.validationsPerMinute.toFixed(1) }
+    ]);
+    console.log(`\n${pooled.failed === 0 ? '✅' : '❌'} ${pooled.passed}/${jobs.length} validations passed, ` +
+      `${pool.counters.launches} browser launches for ${pool.counters.contexts} contexts`);
+  } finally {
+    await pool.close();
+    if (staticServer) await staticServer.close();
+  }
+}
+
+if (require.main === module) {
+  console.log('🌐 Web validation runner (pooled browsers, parallel checklist)\n');
+  main().catch(error => {
+    console.error('\n❌ Validation runner failed:', error.message);
+    process.exit(1);
+  });
+}
+
+module.exports = {
+  BrowserPool,
+  runValidations,
+  runJob,
+  capturePerformance,
+  compareRuns,
+  startStaticServer
+};